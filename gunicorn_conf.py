@@ -0,0 +1,24 @@
+"""
+Gunicorn configuration for the web interface
+
+Run with:
+    gunicorn -c gunicorn_conf.py 'src.web_interface.app:create_app()'
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('FLASK_PORT', '5000')}"
+
+# Build the app in each worker, not in the master: a model loaded onto CUDA (or
+# torch's thread pools) before the fork can't be used by the forked workers, and
+# workers must not share the analyzer's history spill file
+preload_app = False
+
+# One process with a thread pool: requests overlap on I/O and AI calls while
+# transcriptions queue on the recognizer's worker thread
+worker_class = 'gthread'
+workers = int(os.getenv('GUNICORN_WORKERS', '1'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Long uploads can take a while to transcribe
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
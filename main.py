@@ -5,27 +5,51 @@ Main application entry point
 """
 
 import argparse
+import asyncio
+import logging
+import logging.handlers
 import os
+import queue
 import sys
-from dotenv import load_dotenv
 
 # Add src directory to Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from speech_to_text.speech_recognizer import SpeechRecognizer
-from ai_analysis.ai_analyzer import AIAnalyzer
+from ai_analysis.ai_analyzer import get_default_analyzer
 from audio_handler.audio_input import AudioInputHandler
 from output_processor.output_formatter import OutputFormatter
-from web_interface.app import create_app
+
+
+def start_log_listener():
+    """
+    Route log records through a queue so handler I/O runs on a background thread
+
+    Returns:
+        logging.handlers.QueueListener: Running listener (pass to stop_log_listener)
+    """
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+    return listener
+
+
+def stop_log_listener(listener):
+    """Flush queued log records and restore the original handlers"""
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
 
 
 class SpeechToTextAISystem:
     """Main system orchestrator"""
     
     def __init__(self):
+        from dotenv import load_dotenv
         load_dotenv()
         self.speech_recognizer = SpeechRecognizer()
-        self.ai_analyzer = AIAnalyzer()
+        self.ai_analyzer = get_default_analyzer()
         self.audio_handler = AudioInputHandler()
         self.output_formatter = OutputFormatter()
     
@@ -63,31 +87,63 @@ class SpeechToTextAISystem:
             print("Starting live audio processing. Speak into your microphone...")
             print("Press Ctrl+C to stop.")
             
-            while True:
-                # Step 1: Capture audio from microphone
-                audio_data = self.audio_handler.capture_live_audio()
-                
-                if audio_data:
-                    # Step 2: Convert speech to text
-                    transcribed_text = self.speech_recognizer.transcribe_audio(audio_data)
-                    
-                    if transcribed_text.strip():
-                        print(f"\nYou said: {transcribed_text}")
-                        
-                        # Step 3: Analyze with AI
-                        ai_response = self.ai_analyzer.analyze_text(transcribed_text)
-                        
-                        # Step 4: Format and display output
-                        formatted_output = self.output_formatter.format_response(
-                            transcribed_text, ai_response
-                        )
-                        print(formatted_output)
-                        print("\n" + "="*50 + "\n")
+            # Logging from the per-utterance pipeline must not stall capture
+            listener = start_log_listener()
+            try:
+                asyncio.run(self._live_audio_loop())
+            finally:
+                stop_log_listener(listener)
                 
         except KeyboardInterrupt:
             print("\nStopping live audio processing...")
         except Exception as e:
             print(f"Error in live audio processing: {str(e)}")
+    
+    async def _live_audio_loop(self):
+        """Capture the next utterance while the AI is still answering the previous one"""
+        response_task = None
+        
+        while True:
+            # Step 1: Capture audio from microphone (blocking, so run it off the event loop)
+            audio_data = await asyncio.to_thread(self.audio_handler.capture_live_audio)
+            
+            if audio_data:
+                # Step 2: Convert speech to text
+                transcribed_text = await asyncio.to_thread(
+                    self.speech_recognizer.transcribe_audio, audio_data
+                )
+                
+                if transcribed_text.strip():
+                    # Keep transcripts and answers in order on screen
+                    if response_task:
+                        await response_task
+                    
+                    print(f"\nYou said: {transcribed_text}")
+                    
+                    # Steps 3-4 run while the next utterance is captured
+                    response_task = asyncio.create_task(self._respond(transcribed_text))
+    
+    async def _respond(self, transcribed_text):
+        """Analyze an utterance with AI, printing the response as it streams in"""
+        print("AI: ", end="", flush=True)
+        streamed = []
+        
+        def on_token(token):
+            sys.stdout.write(token)
+            sys.stdout.flush()
+            streamed.append(token)
+        
+        # Step 3: Analyze with AI
+        ai_response = await self.ai_analyzer.analyze_text_async(transcribed_text, on_token=on_token)
+        
+        if not streamed:
+            # Nothing was generated (e.g. the AI service failed) - show the fallback response
+            sys.stdout.write(ai_response.get('response', ''))
+        print()
+        
+        # Step 4: Record output in the session (already displayed above)
+        self.output_formatter.format_response(transcribed_text, ai_response)
+        print("\n" + "="*50 + "\n")
 
 
 def main():
@@ -117,6 +173,8 @@ def main():
         system.process_live_audio()
     
     elif args.mode == 'web':
+        # Flask is only needed for the web interface
+        from web_interface.app import create_app
         app = create_app()
         print(f"Starting web interface on http://localhost:{args.port}")
         app.run(host='0.0.0.0', port=args.port, debug=True)
@@ -4,32 +4,187 @@ Processes transcribed text and provides intelligent responses using AI models
 """
 
 import os
-import openai
+import time
+import atexit
+import asyncio
+import importlib.util
 import json
+import hashlib
+import functools
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Generator, Callable
 from datetime import datetime
 import re
+import string
+from collections import deque
 
-# Optional GROQ import
+import numpy as np
+
+from .llm_cache import LLMCache
+from .history_log import HistoryLog
+
+# Optional GROQ support (provider SDKs are imported lazily in AIAnalyzer.__init__)
+GROQ_AVAILABLE = importlib.util.find_spec('groq') is not None
+
+# Optional orjson import (C JSON encoder for cache keys)
 try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
+    import orjson
+    ORJSON_AVAILABLE = True
 except ImportError:
-    GROQ_AVAILABLE = False
-    Groq = None
+    ORJSON_AVAILABLE = False
+    orjson = None
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Timestamps are stored as epoch seconds and only formatted at output boundaries
+_now = time.time
+
+# HTTP client settings (one pooled keep-alive connection set per analyzer)
+REQUEST_TIMEOUT = float(os.getenv('AI_REQUEST_TIMEOUT', '30'))
+CONNECT_TIMEOUT = 5.0
+MAX_RETRIES = 3
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None  # httpx needs h2 for HTTP/2
+
+# Optional sumy support for local extractive summaries (imported lazily, it pulls in nltk)
+SUMY_AVAILABLE = importlib.util.find_spec('sumy') is not None
+EXTRACTIVE_SUMMARY_SENTENCES = 5
+
+# Response cache settings
+EMBEDDING_MODEL = 'text-embedding-3-small'
+LOCAL_EMBEDDING_MODEL = os.getenv('LOCAL_EMBEDDING_MODEL', 'BAAI/bge-small-en-v1.5')
+FASTEMBED_AVAILABLE = importlib.util.find_spec('fastembed') is not None  # Local ONNX embeddings
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_MAX_TEMPERATURE = 0.4  # Only near-deterministic calls use semantic hits
+
+# Simple topic extraction - can be enhanced with NLP libraries
+COMMON_TOPICS = [
+    'weather', 'food', 'work', 'family', 'health', 'technology',
+    'sports', 'music', 'movies', 'travel', 'education', 'business',
+    'science', 'politics', 'entertainment', 'shopping', 'cooking'
+]
+_TOPIC_RE = re.compile(r"\b(" + "|".join(map(re.escape, COMMON_TOPICS)) + r")\b", re.IGNORECASE)
+
+# Canned replies for utterances that don't need the AI service (general analysis only)
+TRIVIAL_RESPONSES = {
+    'hi': 'Hello!',
+    'hello': 'Hi there!',
+    'hey': 'Hi there!',
+    'thanks': 'You\'re welcome!',
+    'thank you': 'You\'re welcome!',
+    'ok': 'Got it.',
+    'okay': 'Got it.',
+    'yes': 'Okay.',
+    'no': 'Understood.'
+}
+SHORT_INPUT_RESPONSE = 'Could you elaborate?'
+_TIME_QUESTION_RE = re.compile(r"^(what time is it|what's the time|what is the time)( now)?$")
+
+
+def _dumps_sorted(obj: Any) -> bytes:
+    """Serialize to canonical (key-sorted) JSON bytes"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(obj, sort_keys=True).encode('utf-8')
+
+
+@functools.lru_cache(maxsize=1)
+def _local_embedder():
+    """Load the local ONNX embedding model once per process"""
+    from fastembed import TextEmbedding
+    return TextEmbedding(LOCAL_EMBEDDING_MODEL)
+
+
+def _drain(stream: Generator[Any, None, Any]) -> Any:
+    """Exhaust a streaming generator and return its return value"""
+    while True:
+        try:
+            next(stream)
+        except StopIteration as done:
+            return done.value
+
 
 class AIAnalyzer:
     """
     AI Analysis class for processing transcribed text and generating intelligent responses
     """
     
-    def __init__(self, model: str = None, max_tokens: int = None, temperature: float = None):
+    ANALYSIS_TYPES = ('general', 'sentiment', 'intent', 'summary')
+    
+    # Fallback responses when the AI service call fails
+    ERROR_RESPONSES = {
+        'general': 'I\'m having trouble connecting to my AI services. Please try again in a moment.',
+        'sentiment': 'Unable to perform sentiment analysis at this time.',
+        'intent': 'Unable to analyze intent at this time.',
+        'summary': 'Unable to create summary at this time.'
+    }
+    
+    # What multi_analyze asks for under each JSON key
+    _MULTI_INSTRUCTIONS = {
+        'sentiment': 'overall sentiment (positive, negative, neutral), confidence score (0-1), '
+                     'specific emotions detected, key phrases that indicate sentiment and a brief explanation',
+        'intent': 'primary intent (question, request, statement, command, etc.), specific action requested, '
+                  'topic or domain, urgency level and required follow-up actions',
+        'summary': 'a concise summary highlighting the main points and key information'
+    }
+    
+    # System prompt for general analysis
+    _GENERAL_SYSTEM_PROMPT = """You are an intelligent AI assistant that analyzes speech input and provides helpful responses.
+        
+        Your tasks:
+        1. Understand the user's speech content and intent
+        2. Provide relevant, helpful, and contextual responses
+        3. Identify key topics, emotions, and any actionable items
+        4. Be conversational and engaging
+        5. If the user asks questions, provide informative answers
+        6. If the user makes statements, acknowledge and expand on the topic appropriately
+        
+        Respond in a natural, conversational manner as if you're having a real conversation."""
+    
+    # Fixed instructions for the single-type analyses. They go in the system message so the
+    # prompt prefix is identical across calls (provider prompt caching); only the text varies.
+    _SENTIMENT_SYSTEM_MSG = {"role": "system", "content": """Analyze the sentiment of the text provided by the user and give a detailed breakdown.
+
+Please provide:
+1. Overall sentiment (positive, negative, neutral)
+2. Confidence score (0-1)
+3. Specific emotions detected
+4. Key phrases that indicate sentiment
+5. A brief explanation of the sentiment analysis
+
+Format your response as a structured analysis."""}
+
+    _INTENT_SYSTEM_MSG = {"role": "system", "content": """Analyze the intent behind the user speech provided by the user.
+
+Identify:
+1. Primary intent (question, request, statement, command, etc.)
+2. Specific action requested (if any)
+3. Topic or domain
+4. Urgency level
+5. Required follow-up actions
+
+Provide a clear analysis of what the user wants or is trying to communicate."""}
+
+    _CONVERSATION_SUMMARY_SYSTEM_MSG = {"role": "system", "content": """Summarize the conversation provided by the user.
+
+Provide:
+1. Key topics discussed
+2. Main points raised
+3. Any decisions or conclusions
+4. Action items (if any)
+5. Overall conversation theme"""}
+
+    _TEXT_SUMMARY_SYSTEM_MSG = {"role": "system", "content": (
+        "Summarize the text provided by the user. "
+        "Provide a concise summary highlighting the main points and key information."
+    )}
+
+    _TEXT_TPL = string.Template('Text: "$text"')
+    _QUOTED_TPL = string.Template('"$text"')
+    
+    def __init__(self, model: str = None, max_tokens: int = None, temperature: float = None,
+                 abstractive_summaries: bool = None, http_client=None):
         """
         Initialize AI analyzer
 
@@ -37,7 +192,13 @@ class AIAnalyzer:
             model (str): AI model to use (default from env)
             max_tokens (int): Maximum tokens for response (default from env)
             temperature (float): Response creativity (default from env)
+            abstractive_summaries (bool): Always summarize with the AI model instead of
+                local extractive summarization (default from env)
+            http_client (httpx.Client): Client for sync API calls (default: the process-wide
+                pooled client from get_shared_http_client)
         """
+        self._http = http_client or get_shared_http_client()
+
         # Determine AI provider
         self.provider = os.getenv('AI_PROVIDER', 'openai').lower()
 
@@ -46,7 +207,10 @@ class AIAnalyzer:
             self.groq_api_key = os.getenv('GROQ_API_KEY')
             if not self.groq_api_key:
                 raise ValueError("GROQ_API_KEY environment variable is required for GROQ provider")
-            self.client = Groq(api_key=self.groq_api_key)
+            from groq import Groq, AsyncGroq
+            self.client = Groq(api_key=self.groq_api_key, http_client=self._http, max_retries=MAX_RETRIES)
+            self.async_client = AsyncGroq(api_key=self.groq_api_key, timeout=REQUEST_TIMEOUT,
+                                          max_retries=MAX_RETRIES)
             self.default_model = 'llama3-8b-8192'
         else:
             # Default to OpenAI
@@ -54,24 +218,44 @@ class AIAnalyzer:
             self.api_key = os.getenv('OPENAI_API_KEY')
             if not self.api_key:
                 raise ValueError("OPENAI_API_KEY environment variable is required")
-            self.client = openai.OpenAI(api_key=self.api_key)
+            import openai
+            self.client = openai.OpenAI(api_key=self.api_key, http_client=self._http, max_retries=MAX_RETRIES)
+            self.async_client = openai.AsyncOpenAI(api_key=self.api_key, timeout=REQUEST_TIMEOUT,
+                                                   max_retries=MAX_RETRIES)
             self.default_model = 'gpt-3.5-turbo'
         
         # Configuration
         self.model = model or os.getenv('AI_MODEL', self.default_model)
         self.max_tokens = max_tokens or int(os.getenv('MAX_TOKENS', '500'))
         self.temperature = temperature or float(os.getenv('TEMPERATURE', '0.7'))
+        if abstractive_summaries is None:
+            abstractive_summaries = os.getenv('ABSTRACTIVE_SUMMARY', 'false').lower() == 'true'
+        self.abstractive_summaries = abstractive_summaries
+        
+        # Async general analyses arriving within this window share one AI call (0 disables)
+        self.batch_window = float(os.getenv('AI_BATCH_WINDOW_MS', '0')) / 1000
+        self._pending: List[Tuple[str, Dict[str, Any], asyncio.Future]] = []
 
-        # Analysis context and history
-        self.conversation_history = []
+        # Analysis context and history (only the last 5 interactions are sent as context)
+        self.conversation_history = deque(maxlen=5)
+        self._history_log = HistoryLog()  # Older turns, spilled to disk for summaries
+        self._turns = 0
+        self._recent_topics = deque(maxlen=10)  # Last ten topic mentions, repeats included
+        
+        # Prebuilt system message; each history turn also carries its own prebuilt chat messages
+        self._system_msg = {"role": "system", "content": self._GENERAL_SYSTEM_PROMPT}
         self.analysis_context = {
-            'session_start': datetime.now().isoformat(),
+            'session_start': _now(),
             'total_interactions': 0,
-            'topics_discussed': [],
+            'topics_discussed': set(),
             'user_preferences': {}
         }
 
-        logger.info(f"AI Analyzer initialized with {self.provider.upper()} provider, model: {self.model}")
+        # Response cache (kept across clear_history - answers don't depend on the session)
+        self.cache = LLMCache(ttl=3600, max_entries=1024)
+        self._local_embeddings = FASTEMBED_AVAILABLE
+
+        logger.info("AI Analyzer initialized with %s provider, model: %s", self.provider.upper(), self.model)
     
     def analyze_text(self, text: str, analysis_type: str = 'general') -> Dict[str, Any]:
         """
@@ -84,295 +268,697 @@ class AIAnalyzer:
         Returns:
             Dict containing analysis results and AI response
         """
-        if not text.strip():
-            return {
-                'error': 'Empty text provided',
-                'response': 'I didn\'t hear anything. Could you please speak again?',
-                'analysis': {}
-            }
+        return _drain(self.analyze_text_stream(text, analysis_type))
+    
+    def analyze_text_stream(self, text: str, analysis_type: str = 'general') -> Generator[str, None, Dict[str, Any]]:
+        """
+        Analyze transcribed text, streaming the AI response as it is generated
         
-        try:
-            # Update context
-            self.analysis_context['total_interactions'] += 1
+        Args:
+            text (str): Transcribed text to analyze
+            analysis_type (str): Type of analysis ('general', 'sentiment', 'intent', 'summary')
             
-            # Perform analysis based on type
-            if analysis_type == 'general':
-                return self._general_analysis(text)
-            elif analysis_type == 'sentiment':
-                return self._sentiment_analysis(text)
-            elif analysis_type == 'intent':
-                return self._intent_analysis(text)
-            elif analysis_type == 'summary':
-                return self._summary_analysis(text)
-            else:
-                return self._general_analysis(text)
-                
+        Yields:
+            str: Fragments of the AI response, in order
+            
+        Returns:
+            Dict containing analysis results and AI response (the generator's return value,
+            same as analyze_text)
+        """
+        analysis_type, request, result = self._start_analysis(text, analysis_type)
+        if result is not None:
+            return result
+        
+        try:
+            ai_response, finish_reason = yield from self._stream_completion(**request)
+            return self._finish_analysis(text, analysis_type, ai_response, finish_reason)
         except Exception as e:
-            logger.error(f"Analysis failed: {e}")
-            return {
-                'error': str(e),
-                'response': 'I encountered an error while analyzing your speech. Please try again.',
-                'analysis': {}
-            }
+            return self._analysis_error(analysis_type, e)
     
-    def _general_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform general AI analysis and response generation"""
-        
-        # Create system prompt for general analysis
-        system_prompt = """You are an intelligent AI assistant that analyzes speech input and provides helpful responses.
-        
-        Your tasks:
-        1. Understand the user's speech content and intent
-        2. Provide relevant, helpful, and contextual responses
-        3. Identify key topics, emotions, and any actionable items
-        4. Be conversational and engaging
-        5. If the user asks questions, provide informative answers
-        6. If the user makes statements, acknowledge and expand on the topic appropriately
+    async def analyze_text_async(self, text: str, analysis_type: str = 'general',
+                                 on_token: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        Analyze transcribed text without blocking the event loop
         
-        Respond in a natural, conversational manner as if you're having a real conversation."""
+        Args:
+            text (str): Transcribed text to analyze
+            analysis_type (str): Type of analysis ('general', 'sentiment', 'intent', 'summary')
+            on_token (callable): Optional callback receiving response fragments as they stream in
+            
+        Returns:
+            Dict containing analysis results and AI response
+        """
+        analysis_type, request, result = self._start_analysis(text, analysis_type)
+        if result is not None:
+            return result
         
-        # Build conversation context
-        messages = [{"role": "system", "content": system_prompt}]
+        if analysis_type == 'general' and self.batch_window > 0:
+            result = await self._batched_general(text, request)
+            if on_token:
+                on_token(result['response'])
+            return result
         
-        # Add recent conversation history for context
-        for interaction in self.conversation_history[-5:]:  # Last 5 interactions
-            messages.append({"role": "user", "content": interaction['user_text']})
-            messages.append({"role": "assistant", "content": interaction['ai_response']})
+        try:
+            ai_response, finish_reason = await self._acomplete(on_token=on_token, **request)
+            return self._finish_analysis(text, analysis_type, ai_response, finish_reason)
+        except Exception as e:
+            return self._analysis_error(analysis_type, e)
+    
+    async def _batched_general(self, text: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a general analysis for the next micro-batch and wait for its result"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, request, future))
+        if len(self._pending) == 1:
+            loop.create_task(self._flush_batch())
+        return await future
+    
+    async def _flush_batch(self):
+        """Send every general analysis queued during the batch window as one AI call"""
+        await asyncio.sleep(self.batch_window)
+        pending, self._pending = self._pending, []
         
-        # Add current user input
-        messages.append({"role": "user", "content": text})
+        if len(pending) == 1:
+            text, request, future = pending[0]
+            try:
+                ai_response, finish_reason = await self._acomplete(**request)
+                future.set_result(self._finish_analysis(text, 'general', ai_response, finish_reason))
+            except Exception as e:
+                future.set_result(self._analysis_error('general', e))
+            return
         
+        numbered = "\n".join(f"{i}. {text}" for i, (text, _, _) in enumerate(pending, 1))
+        messages = [
+            self._system_msg,
+            *self._history_messages(),
+            {"role": "user", "content": (
+                "Respond to each numbered utterance separately. Reply with a JSON object mapping "
+                "each number to your response as a string.\n\n" + numbered
+            )}
+        ]
         try:
-            # Get AI response
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=messages,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                presence_penalty=0.1,
-                frequency_penalty=0.1
+            content, finish_reason = await self._acomplete(
+                messages, self.temperature, response_format={"type": "json_object"}
             )
+            data = json.loads(content)
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_result(self._analysis_error('general', e))
+            return
+        
+        # Results are recorded in utterance order so the history stays in sequence
+        for i, (text, _, future) in enumerate(pending, 1):
+            value = data.get(str(i), '')
+            if not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            future.set_result(self._finish_analysis(text, 'general', value.strip(), finish_reason))
+    
+    async def analyze_all(self, text: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Run sentiment, intent and summary analysis concurrently
+        
+        Args:
+            text (str): Transcribed text to analyze
             
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Extract analysis information
-            analysis = self._extract_analysis_info(text, ai_response)
-            
-            # Update conversation history
-            self.conversation_history.append({
-                'timestamp': datetime.now().isoformat(),
-                'user_text': text,
-                'ai_response': ai_response,
-                'analysis': analysis
-            })
-            
-            # Update topics discussed
-            topics = self._extract_topics(text)
-            self.analysis_context['topics_discussed'].extend(topics)
-            
-            return {
-                'response': ai_response,
-                'analysis': analysis,
-                'confidence': response.choices[0].finish_reason == 'stop',
-                'model_used': self.model,
-                'timestamp': datetime.now().isoformat()
-            }
+        Returns:
+            Dict mapping analysis type to its result
+        """
+        analysis_types = ('sentiment', 'intent', 'summary')
+        results = await asyncio.gather(*(self.analyze_text_async(text, t) for t in analysis_types))
+        return dict(zip(analysis_types, results))
+    
+    def multi_analyze(self, text: str, types: List[str] = ('sentiment', 'intent', 'summary')) -> Dict[str, Dict[str, Any]]:
+        """
+        Run several analysis types with a single AI call
+        
+        One JSON-mode request answers every requested type, instead of one
+        round-trip (and one prefill of the same text) per type.
+        
+        Args:
+            text (str): Transcribed text to analyze
+            types (list): Analysis types to run ('sentiment', 'intent', 'summary')
             
+        Returns:
+            Dict mapping analysis type to its result (same shape as analyze_text)
+        """
+        types = [t for t in types if t in self._MULTI_INSTRUCTIONS]
+        if not text.strip():
+            return {t: self._empty_text_result() for t in types}
+        
+        self.analysis_context['total_interactions'] += 1
+        
+        instructions = "\n".join(f"- {t}: {self._MULTI_INSTRUCTIONS[t]}" for t in types)
+        system_prompt = (
+            "You analyze transcribed user speech. Respond with a JSON object with exactly "
+            f"these keys: {', '.join(types)}. Each value is a string containing:\n{instructions}"
+        )
+        
+        user_content = self._TEXT_TPL.substitute(text=text)
+        if 'summary' in types and self._turns:
+            # Summaries cover the whole conversation, as in _summary_request
+            user_content = f'Conversation so far: "{self._conversation_text()}"\n\n{user_content}'
+        
+        try:
+            content, finish_reason = _drain(self._stream_completion(
+                [{"role": "system", "content": system_prompt}, {"role": "user", "content": user_content}],
+                temperature=0.3,
+                response_format={"type": "json_object"}
+            ))
+            data = json.loads(content)
         except Exception as e:
-            logger.error(f"OpenAI API call failed: {e}")
-            return {
-                'error': str(e),
-                'response': 'I\'m having trouble connecting to my AI services. Please try again in a moment.',
-                'analysis': {}
-            }
+            return {t: self._analysis_error(t, e) for t in types}
+        
+        results = {}
+        timestamp = _now()
+        for t in types:
+            value = data.get(t, '')
+            if not isinstance(value, str):
+                value = json.dumps(value, ensure_ascii=False)
+            results[t] = self._finish_analysis(text, t, value.strip(), finish_reason)
+            results[t]['timestamp'] = timestamp
+        
+        return results
     
-    def _sentiment_analysis(self, text: str) -> Dict[str, Any]:
-        """Perform sentiment analysis on the text"""
+    def _start_analysis(self, text: str, analysis_type: str) -> Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """
+        Validate input, update context and build the chat request for an analysis
         
-        prompt = f"""Analyze the sentiment of the following text and provide a detailed breakdown:
-
-Text: "{text}"
-
-Please provide:
-1. Overall sentiment (positive, negative, neutral)
-2. Confidence score (0-1)
-3. Specific emotions detected
-4. Key phrases that indicate sentiment
-5. A brief explanation of the sentiment analysis
-
-Format your response as a structured analysis."""
+        Returns:
+            Tuple of (analysis type, chat request, result to return without calling the AI service)
+        """
+        if not text.strip():
+            return analysis_type, None, self._empty_text_result()
+        
+        if analysis_type not in self.ANALYSIS_TYPES:
+            analysis_type = 'general'
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=self.max_tokens,
-                temperature=0.3  # Lower temperature for more consistent analysis
-            )
+            # Update context
+            self.analysis_context['total_interactions'] += 1
             
-            ai_response = response.choices[0].message.content.strip()
+            if analysis_type == 'general':
+                canned = self._trivial_response(text)
+                if canned is not None:
+                    return analysis_type, None, {
+                        'response': canned,
+                        'analysis': {'trivial': True, 'user_input_length': len(text)},
+                        'model_used': None,
+                        'timestamp': _now()
+                    }
             
-            return {
-                'response': ai_response,
-                'analysis': {
-                    'type': 'sentiment',
-                    'text_analyzed': text,
-                    'detailed_breakdown': ai_response
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+            if analysis_type == 'summary' and SUMY_AVAILABLE and not self.abstractive_summaries:
+                summary = self._extractive_summary(self._summary_source(text))
+                if summary:
+                    return analysis_type, None, self._summary_result(text, summary, 'stop')
             
+            return analysis_type, getattr(self, f'_{analysis_type}_request')(text), None
         except Exception as e:
-            logger.error(f"Sentiment analysis failed: {e}")
-            return {
+            logger.error("Analysis failed: %s", e)
+            return analysis_type, None, {
                 'error': str(e),
-                'response': 'Unable to perform sentiment analysis at this time.',
+                'response': 'I encountered an error while analyzing your speech. Please try again.',
                 'analysis': {}
             }
     
-    def _intent_analysis(self, text: str) -> Dict[str, Any]:
-        """Analyze user intent from the text"""
-        
-        prompt = f"""Analyze the intent behind the following user speech:
-
-Text: "{text}"
-
-Identify:
-1. Primary intent (question, request, statement, command, etc.)
-2. Specific action requested (if any)
-3. Topic or domain
-4. Urgency level
-5. Required follow-up actions
-
-Provide a clear analysis of what the user wants or is trying to communicate."""
+    def _trivial_response(self, text: str) -> Optional[str]:
+        """
+        Answer greetings, acknowledgements and other trivial input locally
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=self.max_tokens,
-                temperature=0.2
-            )
+        Args:
+            text (str): Transcribed text
             
-            ai_response = response.choices[0].message.content.strip()
+        Returns:
+            Canned response, or None if the text needs the AI service
+        """
+        normalized = text.strip().lower().rstrip('.!?')
+        if normalized in TRIVIAL_RESPONSES:
+            return TRIVIAL_RESPONSES[normalized]
+        if _TIME_QUESTION_RE.match(normalized):
+            return f"It's {datetime.now().strftime('%H:%M')}."
+        if not any(c.isalnum() for c in normalized):
+            # Nothing but punctuation: there is no question to send
+            return SHORT_INPUT_RESPONSE
+        return None
+    
+    def _empty_text_result(self) -> Dict[str, Any]:
+        """Result returned when there is no text to analyze"""
+        return {
+            'error': 'Empty text provided',
+            'response': 'I didn\'t hear anything. Could you please speak again?',
+            'analysis': {}
+        }
+    
+    def _finish_analysis(self, text: str, analysis_type: str, ai_response: str,
+                         finish_reason: Optional[str]) -> Dict[str, Any]:
+        """Build the result for a completed analysis"""
+        return getattr(self, f'_{analysis_type}_result')(text, ai_response, finish_reason)
+    
+    def _analysis_error(self, analysis_type: str, error: Exception) -> Dict[str, Any]:
+        """Build the result for an analysis whose AI service call failed"""
+        logger.error("%s analysis failed: %s", analysis_type.title(), error)
+        return {
+            'error': str(error),
+            'response': self.ERROR_RESPONSES[analysis_type],
+            'analysis': {}
+        }
+    
+    def _general_request(self, text: str) -> Dict[str, Any]:
+        """Build the chat request for general AI analysis and response generation"""
+        
+        # Stable prefix (system prompt + history) so provider-side prompt caching can hit
+        messages = [self._system_msg, *self._history_messages(), {"role": "user", "content": text}]
+        
+        return {
+            'messages': messages,
+            'temperature': self.temperature,
+            'presence_penalty': 0.1,
+            'frequency_penalty': 0.1
+        }
+    
+    def _history_messages(self) -> List[Dict[str, str]]:
+        """Chat messages for the turns in the history window, oldest first"""
+        return [msg for turn in self.conversation_history for msg in (turn['_user_msg'], turn['_ai_msg'])]
+    
+    def _general_result(self, text: str, ai_response: str, finish_reason: Optional[str]) -> Dict[str, Any]:
+        """Record a general AI response in the conversation and build the result"""
+        
+        # Extract analysis information
+        topics = self._extract_topics(text)
+        analysis = self._extract_analysis_info(text, ai_response, topics)
+        
+        # Update conversation history (the turn about to leave the window goes to the log)
+        if len(self.conversation_history) == self.conversation_history.maxlen:
+            oldest = self.conversation_history[0]
+            self._history_log.append({k: v for k, v in oldest.items() if not k.startswith('_')})
+        self.conversation_history.append({
+            'timestamp': _now(),
+            'user_text': text,
+            'ai_response': ai_response,
+            'analysis': analysis,
+            '_user_msg': {"role": "user", "content": text},
+            '_ai_msg': {"role": "assistant", "content": ai_response}
+        })
+        self._turns += 1
+        
+        # Update topics discussed
+        self.analysis_context['topics_discussed'].update(topics)
+        self._recent_topics.extend(topics)
+        
+        return {
+            'response': ai_response,
+            'analysis': analysis,
+            'confidence': finish_reason == 'stop',
+            'model_used': self.model,
+            'timestamp': _now()
+        }
+    
+    def _sentiment_request(self, text: str) -> Dict[str, Any]:
+        """Build the chat request for sentiment analysis on the text"""
+        
+        return {
+            'messages': [self._SENTIMENT_SYSTEM_MSG,
+                         {"role": "user", "content": self._TEXT_TPL.substitute(text=text)}],
+            'temperature': 0.3,  # Lower temperature for more consistent analysis
+            'semantic_text': text,
+            'scope': 'sentiment'
+        }
+    
+    def _sentiment_result(self, text: str, ai_response: str, finish_reason: Optional[str]) -> Dict[str, Any]:
+        """Build the sentiment analysis result"""
+        
+        return {
+            'response': ai_response,
+            'analysis': {
+                'type': 'sentiment',
+                'text_analyzed': text,
+                'detailed_breakdown': ai_response
+            },
+            'timestamp': _now()
+        }
+    
+    def _intent_request(self, text: str) -> Dict[str, Any]:
+        """Build the chat request for analyzing user intent from the text"""
+        
+        return {
+            'messages': [self._INTENT_SYSTEM_MSG,
+                         {"role": "user", "content": self._TEXT_TPL.substitute(text=text)}],
+            'temperature': 0.2,
+            'semantic_text': text,
+            'scope': 'intent'
+        }
+    
+    def _intent_result(self, text: str, ai_response: str, finish_reason: Optional[str]) -> Dict[str, Any]:
+        """Build the intent analysis result"""
+        
+        return {
+            'response': ai_response,
+            'analysis': {
+                'type': 'intent',
+                'text_analyzed': text,
+                'intent_breakdown': ai_response
+            },
+            'timestamp': _now()
+        }
+    
+    def _summary_source(self, text: str) -> str:
+        """Text to summarize: the whole conversation plus the new text, or just the text"""
+        if self._turns:
+            return self._conversation_text() + " " + text
+        return text
+    
+    def _extractive_summary(self, text: str) -> Optional[str]:
+        """
+        Summarize locally by picking the most central sentences (TextRank)
+        
+        Args:
+            text (str): Text to summarize
             
-            return {
-                'response': ai_response,
-                'analysis': {
-                    'type': 'intent',
-                    'text_analyzed': text,
-                    'intent_breakdown': ai_response
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+        Returns:
+            Summary text, or None if extractive summarization is unavailable
+        """
+        try:
+            from sumy.parsers.plaintext import PlaintextParser
+            from sumy.nlp.tokenizers import Tokenizer
+            from sumy.summarizers.text_rank import TextRankSummarizer
             
+            parser = PlaintextParser.from_string(text, Tokenizer("english"))
+            sentences = TextRankSummarizer()(parser.document, EXTRACTIVE_SUMMARY_SENTENCES)
+            return " ".join(str(sentence) for sentence in sentences) or None
         except Exception as e:
-            logger.error(f"Intent analysis failed: {e}")
-            return {
-                'error': str(e),
-                'response': 'Unable to analyze intent at this time.',
-                'analysis': {}
-            }
+            # e.g. missing nltk tokenizer data; fall back to the AI model
+            logger.warning("Extractive summary failed, using AI summary: %s", e)
+            return None
     
-    def _summary_analysis(self, text: str) -> Dict[str, Any]:
-        """Create a summary of the conversation or text"""
+    def _summary_request(self, text: str) -> Dict[str, Any]:
+        """Build the chat request for a summary of the conversation or text"""
         
-        if len(self.conversation_history) > 0:
+        summary_text = self._summary_source(text)
+        if self._turns:
             # Summarize conversation history
-            all_text = " ".join([item['user_text'] for item in self.conversation_history])
-            all_text += " " + text
-            
-            prompt = f"""Summarize the following conversation:
-
-{all_text}
-
-Provide:
-1. Key topics discussed
-2. Main points raised
-3. Any decisions or conclusions
-4. Action items (if any)
-5. Overall conversation theme"""
+            messages = [self._CONVERSATION_SUMMARY_SYSTEM_MSG, {"role": "user", "content": summary_text}]
         else:
             # Summarize just the current text
-            prompt = f"""Summarize the following text:
-
-"{text}"
-
-Provide a concise summary highlighting the main points and key information."""
+            messages = [self._TEXT_SUMMARY_SYSTEM_MSG,
+                        {"role": "user", "content": self._QUOTED_TPL.substitute(text=text)}]
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                max_tokens=self.max_tokens,
-                temperature=0.3
-            )
+        return {
+            'messages': messages,
+            'temperature': 0.3,
+            'semantic_text': summary_text,
+            'scope': 'summary'
+        }
+    
+    def _summary_result(self, text: str, ai_response: str, finish_reason: Optional[str]) -> Dict[str, Any]:
+        """Build the summary analysis result"""
+        
+        return {
+            'response': ai_response,
+            'analysis': {
+                'type': 'summary',
+                'text_analyzed': text,
+                'summary': ai_response
+            },
+            'timestamp': _now()
+        }
+    
+    def _stream_completion(self, messages: List[Dict[str, str]], temperature: float,
+                           semantic_text: Optional[str] = None, scope: Optional[str] = None,
+                           **params) -> Generator[str, None, Tuple[str, Optional[str]]]:
+        """
+        Stream a chat completion, serving it from the response cache when possible
+        
+        Args:
+            messages (list): Chat messages to send
+            temperature (float): Sampling temperature
+            semantic_text (str): Text used for semantic cache lookup (None to disable)
+            scope (str): Analysis type, so semantic hits never cross analysis types
+            **params: Extra arguments for the chat completion call
             
-            ai_response = response.choices[0].message.content.strip()
+        Yields:
+            str: Response text fragments as they arrive (the whole text on a cache hit)
             
-            return {
-                'response': ai_response,
-                'analysis': {
-                    'type': 'summary',
-                    'text_analyzed': text,
-                    'summary': ai_response
-                },
-                'timestamp': datetime.now().isoformat()
-            }
+        Returns:
+            Tuple of (response text, finish reason)
+        """
+        cache_key, embedding, cached = self._cache_lookup(messages, temperature, semantic_text, scope, params)
+        if cached is not None:
+            yield cached['content']
+            return cached['content'], cached['finish_reason']
+        
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=temperature,
+            stream=True,
+            **params
+        )
+        
+        parts = []
+        finish_reason = None
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            choice = chunk.choices[0]
+            if choice.delta.content:
+                parts.append(choice.delta.content)
+                yield choice.delta.content
+            if choice.finish_reason:
+                finish_reason = choice.finish_reason
+        
+        content = "".join(parts).strip()
+        self._cache_store(cache_key, content, finish_reason, embedding, scope)
+        
+        return content, finish_reason
+    
+    async def _acomplete(self, messages: List[Dict[str, str]], temperature: float,
+                         semantic_text: Optional[str] = None, scope: Optional[str] = None,
+                         on_token: Optional[Callable[[str], None]] = None,
+                         **params) -> Tuple[str, Optional[str]]:
+        """
+        Async chat completion, serving it from the response cache when possible
+        
+        Args:
+            messages (list): Chat messages to send
+            temperature (float): Sampling temperature
+            semantic_text (str): Text used for semantic cache lookup (None to disable)
+            scope (str): Analysis type, so semantic hits never cross analysis types
+            on_token (callable): Stream the response, passing each fragment to this callback
+            **params: Extra arguments for the chat completion call
             
-        except Exception as e:
-            logger.error(f"Summary analysis failed: {e}")
-            return {
-                'error': str(e),
-                'response': 'Unable to create summary at this time.',
-                'analysis': {}
-            }
+        Returns:
+            Tuple of (response text, finish reason)
+        """
+        # The semantic lookup may call the embeddings API, so keep it off the event loop
+        cache_key, embedding, cached = await asyncio.to_thread(
+            self._cache_lookup, messages, temperature, semantic_text, scope, params
+        )
+        if cached is not None:
+            if on_token:
+                on_token(cached['content'])
+            return cached['content'], cached['finish_reason']
+        
+        response = await self.async_client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=self.max_tokens,
+            temperature=temperature,
+            stream=on_token is not None,
+            **params
+        )
+        
+        if on_token is None:
+            content = response.choices[0].message.content.strip()
+            finish_reason = response.choices[0].finish_reason
+        else:
+            parts = []
+            finish_reason = None
+            async for chunk in response:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                    on_token(choice.delta.content)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+            content = "".join(parts).strip()
+        
+        self._cache_store(cache_key, content, finish_reason, embedding, scope)
+        
+        return content, finish_reason
+    
+    def _cache_lookup(self, messages: List[Dict[str, str]], temperature: float,
+                      semantic_text: Optional[str], scope: Optional[str],
+                      params: Dict[str, Any]) -> Tuple[str, Optional[np.ndarray], Optional[Dict[str, Any]]]:
+        """
+        Look up a chat request in the response cache
+        
+        Returns:
+            Tuple of (cache key, embedding used for the semantic lookup, cached response or None)
+        """
+        cache_key = hashlib.sha256(_dumps_sorted({
+            'provider': self.provider,
+            'model': self.model,
+            'messages': messages,
+            'temperature': temperature,
+            'max_tokens': self.max_tokens,
+            'params': params
+        })).hexdigest()
+        
+        cached = self.cache.get(cache_key)
+        
+        embedding = None
+        if cached is None and semantic_text and temperature < SEMANTIC_CACHE_MAX_TEMPERATURE:
+            embedding = self._embed(semantic_text)
+            if embedding is not None:
+                cached = self.cache.semantic_get(embedding, SEMANTIC_CACHE_THRESHOLD,
+                                                 scope=f"{self.model}:{scope}")
+        
+        if cached is not None:
+            logger.debug("Serving AI response from cache")
+        
+        return cache_key, embedding, cached
+    
+    def _cache_store(self, cache_key: str, content: str, finish_reason: Optional[str],
+                     embedding: Optional[np.ndarray], scope: Optional[str]):
+        """Store a chat completion in the response cache"""
+        self.cache.set(
+            cache_key,
+            {'content': content, 'finish_reason': finish_reason},
+            embedding=embedding,
+            scope=f"{self.model}:{scope}"
+        )
     
-    def _extract_analysis_info(self, user_text: str, ai_response: str) -> Dict[str, Any]:
+    def _embed(self, text: str) -> Optional[np.ndarray]:
+        """Get an embedding for semantic cache lookup (None if unavailable)"""
+        if self._local_embeddings:
+            # Local model: no network round-trip on every cache lookup, works for any provider
+            try:
+                return np.asarray(next(_local_embedder().embed([text])), dtype=np.float32)
+            except Exception as e:
+                # e.g. the model could not be downloaded; don't retry on every lookup
+                logger.warning("Local embedding failed, using embeddings API instead: %s", e)
+                self._local_embeddings = False
+        
+        if self.provider != 'openai':
+            return None
+
+        try:
+            response = self.client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+            return np.asarray(response.data[0].embedding, dtype=np.float32)
+        except Exception as e:
+            logger.warning("Embedding request failed, skipping semantic cache: %s", e)
+            return None
+
+    def _extract_analysis_info(self, user_text: str, ai_response: str,
+                               topics: Optional[List[str]] = None) -> Dict[str, Any]:
         """Extract analysis information from the interaction"""
         
+        if topics is None:
+            topics = self._extract_topics(user_text)
+        
         return {
             'word_count': len(user_text.split()),
             'character_count': len(user_text),
             'contains_question': '?' in user_text,
             'contains_exclamation': '!' in user_text,
-            'response_length': len(ai_response.split()),
-            'topics': self._extract_topics(user_text)
+            # Approximate word count without splitting the (possibly long) response
+            'response_length': ai_response.count(' ') + 1 if ai_response else 0,
+            'topics': topics
         }
     
+    def _conversation_text(self) -> str:
+        """Every user utterance this session, oldest first (logged turns, then the recent window)"""
+        turns = list(self._history_log) + list(self.conversation_history)
+        return " ".join(turn['user_text'] for turn in turns)
+    
     def _extract_topics(self, text: str) -> List[str]:
         """Extract potential topics from text using simple keyword analysis"""
         
-        # Simple topic extraction - can be enhanced with NLP libraries
-        common_topics = [
-            'weather', 'food', 'work', 'family', 'health', 'technology', 
-            'sports', 'music', 'movies', 'travel', 'education', 'business',
-            'science', 'politics', 'entertainment', 'shopping', 'cooking'
-        ]
-        
-        text_lower = text.lower()
-        found_topics = [topic for topic in common_topics if topic in text_lower]
-        
-        return found_topics
+        # Single pass over the text; each topic is reported once, in order of first mention
+        return list(dict.fromkeys(match.lower() for match in _TOPIC_RE.findall(text)))
     
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get summary of the current conversation session"""
         
+        topics = list(self.analysis_context['topics_discussed'])
+        
         return {
-            'session_info': self.analysis_context,
-            'total_interactions': len(self.conversation_history),
-            'recent_topics': list(set(self.analysis_context['topics_discussed'][-10:])),
-            'session_duration': datetime.now().isoformat()
+            'session_info': {
+                **self.analysis_context,
+                'session_start': datetime.fromtimestamp(self.analysis_context['session_start']).isoformat(),
+                'topics_discussed': topics
+            },
+            'total_interactions': self._turns,
+            'recent_topics': list(dict.fromkeys(self._recent_topics)),
+            'session_duration': _now() - self.analysis_context['session_start']
         }
     
+    @staticmethod
+    def _create_http_client():
+        """
+        Create the pooled HTTP client shared by all sync API calls
+
+        Returns:
+            httpx.Client: Keep-alive client (HTTP/2 when h2 is installed)
+        """
+        import httpx
+
+        # Pool and protocol options belong to the transport when one is passed explicitly
+        transport = httpx.HTTPTransport(
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=40),
+            retries=MAX_RETRIES  # Connection-level retries; the SDK retries failed requests
+        )
+        return httpx.Client(transport=transport, timeout=httpx.Timeout(REQUEST_TIMEOUT, connect=CONNECT_TIMEOUT))
+
+    def close(self):
+        """Close the history log (the HTTP client is shared, so it is left open)"""
+        self._history_log.close()
+
     def clear_history(self):
         """Clear conversation history and reset context"""
         
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._history_log.clear()
+        self._turns = 0
+        self._recent_topics.clear()
         self.analysis_context = {
-            'session_start': datetime.now().isoformat(),
+            'session_start': _now(),
             'total_interactions': 0,
-            'topics_discussed': [],
+            'topics_discussed': set(),
             'user_preferences': {}
         }
         logger.info("Conversation history cleared")
+
+
+@functools.lru_cache(maxsize=1)
+def get_shared_http_client():
+    """
+    Get the process-wide pooled HTTP client, creating it on first use
+    
+    Every AIAnalyzer reuses its keep-alive connections, so TLS handshakes are
+    paid once per host rather than once per analyzer.
+    
+    Returns:
+        httpx.Client: Shared client, closed at interpreter exit
+    """
+    client = AIAnalyzer._create_http_client()
+    atexit.register(client.close)
+    return client
+
+
+@functools.lru_cache(maxsize=1)
+def get_default_analyzer() -> AIAnalyzer:
+    """
+    Get the process-wide AIAnalyzer, creating it on first use
+    
+    Every caller shares one analyzer, so SDK setup and the HTTP connection pool
+    are paid once per process. Under gunicorn, use preload_app = True to create
+    it once in the master before workers fork.
+    
+    Returns:
+        AIAnalyzer: Shared analyzer configured from the environment
+    """
+    return AIAnalyzer()
@@ -0,0 +1,101 @@
+"""
+Conversation History Log Module
+Append-only, compressed on-disk store for conversation turns that have left the in-memory window
+"""
+
+import pickle
+import struct
+import tempfile
+import threading
+import zlib
+import logging
+from typing import Any, Dict, Iterator
+
+# Optional zstandard import (falls back to zlib)
+try:
+    import zstandard as zstd
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+    zstd = None
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct('<I')
+
+
+class HistoryLog:
+    """
+    Spill log for old conversation turns
+
+    Each turn is pickled, compressed and appended to an anonymous temporary file
+    as a length-prefixed record, so long sessions keep only the recent window in memory.
+    """
+
+    def __init__(self):
+        """Initialize history log"""
+        self._file = tempfile.TemporaryFile(prefix='conversation-', suffix='.log')
+        self._lock = threading.Lock()
+        self._count = 0
+
+        if ZSTD_AVAILABLE:
+            self._compress = zstd.ZstdCompressor(level=3).compress
+            self._decompress = zstd.ZstdDecompressor().decompress
+        else:
+            self._compress = zlib.compress
+            self._decompress = zlib.decompress
+
+    def append(self, entry: Dict[str, Any]):
+        """
+        Append a conversation turn
+
+        Args:
+            entry (dict): Conversation history entry
+        """
+        record = self._compress(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._file.seek(0, 2)
+            self._file.write(_LENGTH.pack(len(record)))
+            self._file.write(record)
+            self._count += 1
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        """
+        Read turns back in the order they were appended
+
+        Records are read from the file one at a time, so only one turn is held in memory.
+        Turns appended after iteration starts are not included.
+        """
+        with self._lock:
+            self._file.flush()
+            end = self._file.seek(0, 2)
+
+        offset = 0
+        while offset < end:
+            with self._lock:
+                self._file.seek(offset)
+                header = self._file.read(_LENGTH.size)
+                if len(header) < _LENGTH.size:
+                    return  # Cleared while iterating
+                (size,) = _LENGTH.unpack(header)
+                record = self._file.read(size)
+            offset += _LENGTH.size + size
+            yield pickle.loads(self._decompress(record))
+
+    def clear(self):
+        """Remove all logged turns"""
+        with self._lock:
+            self._file.seek(0)
+            self._file.truncate()
+            self._count = 0
+
+    def close(self):
+        """Close and delete the log file"""
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __len__(self) -> int:
+        return self._count
@@ -0,0 +1,210 @@
+"""
+LLM Response Cache Module
+Two-tier cache for chat completion responses: exact request match and semantic similarity
+"""
+
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class LLMCache:
+    """
+    In-memory cache for AI responses
+
+    - Exact tier: request hash -> response, with TTL and LRU eviction
+    - Semantic tier: embedding of the analyzed text -> response, matched by cosine similarity
+    """
+
+    def __init__(self, ttl: float = 3600, max_entries: int = 1024):
+        """
+        Initialize LLM cache
+
+        Args:
+            ttl (float): Seconds before a cached response expires
+            max_entries (int): Maximum number of cached responses
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+        # key -> (expires_at, response)
+        self._entries = OrderedDict()
+
+        # Semantic index: L2-normalized embeddings in a preallocated matrix (allocated on first
+        # insert, once the dimension is known). Rows [0, _sem_count) are live.
+        self._sem_matrix: Optional[np.ndarray] = None
+        self._sem_scope_ids: Optional[np.ndarray] = None
+        self._sem_count = 0
+        self._sem_keys: List[str] = []          # row -> key
+        self._sem_rows: Dict[str, int] = {}     # key -> row
+        self._scope_ids: Dict[Optional[str], int] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+        # Shared by Flask request threads and asyncio worker threads
+        self._lock = threading.RLock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get cached response for an exact request key
+
+        Args:
+            key (str): Request hash
+
+        Returns:
+            Cached response or None on miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, response = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return response
+
+    def set(self, key: str, response: Dict[str, Any], embedding: Optional[np.ndarray] = None,
+            scope: Optional[str] = None):
+        """
+        Store a response
+
+        Args:
+            key (str): Request hash
+            response (dict): Response to cache
+            embedding (np.ndarray): Optional embedding of the analyzed text for semantic lookup
+            scope (str): Semantic lookups only match entries within the same scope
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+
+            if embedding is not None:
+                self._sem_add(key, embedding, scope)
+
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def semantic_get(self, embedding: np.ndarray, threshold: float = 0.92,
+                     scope: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get cached response whose embedding is most similar to the query
+
+        Args:
+            embedding (np.ndarray): Embedding of the text being analyzed
+            threshold (float): Minimum cosine similarity for a hit
+            scope (str): Only consider entries stored with this scope
+
+        Returns:
+            Cached response or None on miss
+        """
+        query = np.asarray(embedding, dtype=np.float32).ravel()
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            return None
+
+        with self._lock:
+            scope_id = self._scope_ids.get(scope)
+            if self._sem_count == 0 or scope_id is None:
+                return None
+
+            # Rows are unit vectors, so cosine similarity is a single matrix-vector product
+            n = self._sem_count
+            sims = self._sem_matrix[:n] @ (query / query_norm)
+            sims[self._sem_scope_ids[:n] != scope_id] = -1.0
+
+            candidates = np.flatnonzero(sims >= threshold)
+            if candidates.size == 0:
+                return None
+
+            # Best match first; an expired entry is skipped in favour of the next one. Keys are
+            # taken up front because removing an entry moves another row into its slot.
+            candidates = candidates[np.argsort(-sims[candidates], kind='stable')]
+            now = time.monotonic()
+            for key, similarity in [(self._sem_keys[i], sims[i]) for i in candidates]:
+                expires_at, response = self._entries[key]
+                if expires_at < now:
+                    self._remove(key)
+                    continue
+
+                self._entries.move_to_end(key)
+                self.hits += 1
+                logger.debug("Semantic cache hit (similarity=%.3f)", similarity)
+                return response
+
+            self.misses += 1
+            return None
+
+    def clear(self):
+        """Remove all cached responses and reset the cache to its initial state"""
+        with self._lock:
+            self._entries.clear()
+            self._sem_matrix = None
+            self._sem_scope_ids = None
+            self._sem_count = 0
+            self._sem_keys = []
+            self._sem_rows = {}
+            self._scope_ids = {}
+            self.hits = 0
+            self.misses = 0
+
+    def _sem_add(self, key: str, embedding: np.ndarray, scope: Optional[str]):
+        """Normalize an embedding and append it to the semantic index"""
+        vector = np.asarray(embedding, dtype=np.float32).ravel()
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return
+
+        if self._sem_matrix is None or self._sem_matrix.shape[1] != vector.shape[0]:
+            # One extra row: set() inserts before evicting down to max_entries
+            self._sem_matrix = np.zeros((self.max_entries + 1, vector.shape[0]), dtype=np.float32)
+            self._sem_scope_ids = np.zeros(self.max_entries + 1, dtype=np.int32)
+            self._sem_count = 0
+            self._sem_keys = []
+            self._sem_rows = {}
+
+        scope_id = self._scope_ids.setdefault(scope, len(self._scope_ids))
+        row = self._sem_count
+        self._sem_matrix[row] = vector / norm
+        self._sem_scope_ids[row] = scope_id
+        self._sem_keys.append(key)
+        self._sem_rows[key] = row
+        self._sem_count += 1
+
+    def _remove(self, key: str):
+        """Remove a key from both tiers"""
+        self._entries.pop(key, None)
+        row = self._sem_rows.pop(key, None)
+        if row is None:
+            return
+
+        # Move the last live row into the freed slot
+        last = self._sem_count - 1
+        last_key = self._sem_keys.pop()
+        if row != last:
+            self._sem_matrix[row] = self._sem_matrix[last]
+            self._sem_scope_ids[row] = self._sem_scope_ids[last]
+            self._sem_keys[row] = last_key
+            self._sem_rows[last_key] = row
+        self._sem_count = last
+
+    def __len__(self) -> int:
+        return len(self._entries)
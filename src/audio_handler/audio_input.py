@@ -5,17 +5,18 @@ Handles audio input from microphone and file sources
 
 import os
 import wave
+import struct
 import speech_recognition as sr
 import numpy as np
-from pydub import AudioSegment
 from pydub.utils import which
-import tempfile
+import subprocess
 import logging
 import threading
-import queue
 import time
-import io
-from typing import Optional, Tuple, List
+from typing import BinaryIO, Optional, Tuple, List, Union
+
+from .ring_buffer import SPSCRingBuffer
+from .vad_capture import VADCapture, VAD_CAPTURE_AVAILABLE, find_input_device
 
 # Optional pyaudio import
 try:
@@ -25,10 +26,51 @@ except ImportError:
     PYAUDIO_AVAILABLE = False
     pyaudio = None
 
+# Optional soundfile import (libsndfile decodes FLAC/OGG from memory)
+try:
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDFILE_AVAILABLE = False
+    sf = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Resolved once at import; which() stats every PATH directory on each call
+_FFMPEG_PATH = which("ffmpeg")
+
+# Formats load_audio_stream decodes with soundfile instead of ffmpeg
+_SOUNDFILE_FORMATS = ('.flac', '.ogg')
+
+# ffmpeg raw input format for signed little-endian AudioData sample widths
+_FFMPEG_PCM_FORMATS = {2: 's16le', 3: 's24le', 4: 's32le'}
+
+# Canonical 44-byte PCM WAV header
+_WAV_HEADER = struct.Struct('<4sI4s4sIHHIIHH4sI')
+
+
+def _wav_header(data_size: int, sample_rate: int, sample_width: int, channels: int = 1) -> bytes:
+    """
+    Build a PCM WAV header
+    
+    Args:
+        data_size (int): Size of the PCM data in bytes
+        sample_rate (int): Sample rate in Hz
+        sample_width (int): Bytes per sample
+        channels (int): Number of channels
+        
+    Returns:
+        bytes: RIFF/WAVE header to write before the PCM data
+    """
+    block_align = channels * sample_width
+    return _WAV_HEADER.pack(
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b'data', data_size
+    )
+
 
 class AudioInputHandler:
     """
@@ -56,10 +98,20 @@ class AudioInputHandler:
         # Initialize speech recognition
         self.recognizer = sr.Recognizer()
         self.microphone = None
+        self._source = None  # Open microphone stream, held for the duration of continuous recording
+        self._devices_cache = None  # Input devices from the last PortAudio enumeration
+
+        # Callback stream + VAD/energy gating capture, used instead of recognizer.listen when available
+        self._vad = None
+        self._vad_device = None  # sounddevice index of the microphone chosen in setup_microphone
+        self.use_vad_capture = (
+            VAD_CAPTURE_AVAILABLE
+            and os.getenv('AUDIO_VAD_CAPTURE', 'true').lower() == 'true'
+        )
 
         # Audio recording state
         self.is_recording = False
-        self.audio_queue = queue.Queue()
+        self.audio_buffer = SPSCRingBuffer(capacity=32)  # Recording thread -> consumer
 
         # Initialize PyAudio if available
         if PYAUDIO_AVAILABLE:
@@ -73,27 +125,34 @@ class AudioInputHandler:
             logger.warning("PyAudio not available - microphone input will not work")
             self.audio = None
         
-        # Check for ffmpeg (required for pydub)
-        if not which("ffmpeg"):
+        # Check for ffmpeg (required for non-WAV formats)
+        if not _FFMPEG_PATH:
             logger.warning("ffmpeg not found. Some audio formats may not be supported.")
     
     def get_available_microphones(self) -> List[dict]:
-        """Get list of available microphone devices"""
+        """Get list of available microphone devices (cached; see refresh_devices)"""
         if not self.audio:
             return []
         
-        devices = []
-        for i in range(self.audio.get_device_count()):
-            device_info = self.audio.get_device_info_by_index(i)
-            if device_info['maxInputChannels'] > 0:
-                devices.append({
+        if self._devices_cache is None:
+            infos = ((i, self.audio.get_device_info_by_index(i)) for i in range(self.audio.get_device_count()))
+            self._devices_cache = [
+                {
                     'index': i,
-                    'name': device_info['name'],
-                    'channels': device_info['maxInputChannels'],
-                    'sample_rate': device_info['defaultSampleRate']
-                })
+                    'name': info['name'],
+                    'channels': info['maxInputChannels'],
+                    'sample_rate': info['defaultSampleRate']
+                }
+                for i, info in infos
+                if info['maxInputChannels'] > 0
+            ]
         
-        return devices
+        return list(self._devices_cache)
+    
+    def refresh_devices(self) -> List[dict]:
+        """Re-enumerate microphone devices (e.g. after a device is plugged in)"""
+        self._devices_cache = None
+        return self.get_available_microphones()
     
     def setup_microphone(self, device_index: Optional[int] = None) -> bool:
         """
@@ -105,6 +164,9 @@ class AudioInputHandler:
         Returns:
             bool: True if setup successful
         """
+        if self.use_vad_capture:
+            self._select_vad_device(device_index)
+        
         try:
             self.microphone = sr.Microphone(
                 device_index=device_index,
@@ -135,25 +197,36 @@ class AudioInputHandler:
         Returns:
             AudioData object or None if no audio captured
         """
+        # Set timeouts
+        speech_timeout = timeout or float(os.getenv('SPEECH_RECOGNITION_TIMEOUT', '5'))
+        phrase_timeout = phrase_timeout or float(os.getenv('SPEECH_RECOGNITION_PHRASE_TIMEOUT', '1'))
+        
+        if self.use_vad_capture:
+            return self._capture_with_vad(speech_timeout, phrase_timeout)
+        
         if not self.microphone:
             if not self.setup_microphone():
                 logger.error("Cannot capture audio: microphone not available")
                 return None
         
         try:
-            # Set timeouts
-            speech_timeout = timeout or float(os.getenv('SPEECH_RECOGNITION_TIMEOUT', '5'))
-            phrase_timeout = phrase_timeout or float(os.getenv('SPEECH_RECOGNITION_PHRASE_TIMEOUT', '1'))
-            
             logger.info("Listening for speech...")
             
-            with self.microphone as source:
-                # Listen for audio with timeout
+            if self._source is not None:
+                # Continuous recording keeps the stream open between captures
                 audio = self.recognizer.listen(
-                    source, 
+                    self._source,
                     timeout=speech_timeout,
                     phrase_time_limit=phrase_timeout
                 )
+            else:
+                with self.microphone as source:
+                    # Listen for audio with timeout
+                    audio = self.recognizer.listen(
+                        source, 
+                        timeout=speech_timeout,
+                        phrase_time_limit=phrase_timeout
+                    )
             
             logger.info("Audio captured successfully")
             return audio
@@ -165,10 +238,92 @@ class AudioInputHandler:
             logger.error(f"Audio capture failed: {e}")
             return None
     
+    def _select_vad_device(self, device_index: Optional[int]):
+        """
+        Point VAD capture at the microphone chosen by PyAudio device index
+        
+        Falls back to recognizer.listen capture when the device can't be found through sounddevice,
+        so an explicitly chosen microphone is never silently swapped for the system default.
+        
+        Args:
+            device_index (int): PyAudio device index (None for the default input)
+        """
+        if device_index is None:
+            vad_device = None
+        elif self.audio:
+            try:
+                name = self.audio.get_device_info_by_index(device_index)['name']
+                vad_device = find_input_device(name)
+            except Exception as e:
+                logger.error(f"Failed to look up microphone {device_index} for VAD capture: {e}")
+                vad_device = None
+            if vad_device is None:
+                logger.warning(f"Microphone {device_index} not found for VAD capture, using speech_recognition capture")
+                self._stop_vad()
+                self.use_vad_capture = False
+                return
+        else:
+            # Without PyAudio, sounddevice's enumeration is the only one there is
+            vad_device = device_index
+        
+        if vad_device != self._vad_device:
+            self._stop_vad()
+            self._vad_device = vad_device
+    
+    def _capture_with_vad(self, speech_timeout: float, phrase_timeout: float) -> Optional[sr.AudioData]:
+        """
+        Capture audio through the callback stream, segmenting the utterance with the VAD
+        
+        Args:
+            speech_timeout (float): Maximum time to wait for speech
+            phrase_timeout (float): Maximum phrase length
+            
+        Returns:
+            AudioData object or None if no audio captured
+        """
+        try:
+            if self._vad is None:
+                self._vad = VADCapture(sample_rate=self.sample_rate,
+                                       device=self._vad_device,
+                                       energy_threshold=self.recognizer.energy_threshold)
+                if self._vad.vad is None:
+                    self._vad.calibrate()
+            
+            logger.info("Listening for speech...")
+            audio = self._vad.capture(
+                timeout=speech_timeout,
+                phrase_time_limit=phrase_timeout,
+                pause_threshold=self.recognizer.pause_threshold
+            )
+            logger.info("Audio captured successfully")
+            return audio
+            
+        except sr.WaitTimeoutError:
+            logger.info("No speech detected within timeout period")
+            return None
+        except Exception as e:
+            logger.error(f"VAD capture failed, falling back to speech_recognition: {e}")
+            self._stop_vad()
+            self.use_vad_capture = False
+            return None
+    
+    def _stop_vad(self):
+        """Close the VAD capture stream"""
+        if self._vad is not None:
+            try:
+                self._vad.stop()
+            except Exception as e:
+                logger.error(f"Failed to close VAD capture stream: {e}")
+            self._vad = None
+    
     def start_continuous_recording(self, callback_func=None):
         """
         Start continuous audio recording in background thread
         
+        Captured audio is handed to callback_func on a separate dispatch thread, so a
+        slow callback never delays the next capture. Without a callback, read it with
+        get_recorded_audio.
+        
         Args:
             callback_func: Function to call when audio is captured
         """
@@ -176,9 +331,13 @@ class AudioInputHandler:
             logger.warning("Recording already in progress")
             return
         
-        if not self.microphone:
-            if not self.setup_microphone():
-                logger.error("Cannot start recording: microphone not available")
+        if not self.use_vad_capture:
+            if not self.microphone:
+                if not self.setup_microphone():
+                    logger.error("Cannot start recording: microphone not available")
+                    return
+            
+            if not self._open_stream():
                 return
         
         self.is_recording = True
@@ -189,6 +348,14 @@ class AudioInputHandler:
         self.recording_thread.daemon = True
         self.recording_thread.start()
         
+        if callback_func:
+            self.dispatch_thread = threading.Thread(
+                target=self._dispatch_worker,
+                args=(callback_func,)
+            )
+            self.dispatch_thread.daemon = True
+            self.dispatch_thread.start()
+        
         logger.info("Continuous recording started")
     
     def stop_continuous_recording(self):
@@ -196,20 +363,65 @@ class AudioInputHandler:
         self.is_recording = False
         if hasattr(self, 'recording_thread'):
             self.recording_thread.join(timeout=2)
+        if hasattr(self, 'dispatch_thread'):
+            self.dispatch_thread.join(timeout=2)
+        self._close_stream()
         logger.info("Continuous recording stopped")
     
+    def _open_stream(self) -> bool:
+        """Open the microphone stream once so captures don't reopen PortAudio each time"""
+        try:
+            self._source = self.microphone.__enter__()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to open microphone stream: {e}")
+            self._source = None
+            return False
+    
+    def _close_stream(self):
+        """Close the microphone stream opened by _open_stream"""
+        if self._source is not None:
+            self._source = None
+            try:
+                self.microphone.__exit__(None, None, None)
+            except Exception as e:
+                logger.error(f"Failed to close microphone stream: {e}")
+    
+    def get_recorded_audio(self, timeout: float = None) -> Optional[sr.AudioData]:
+        """
+        Get the next utterance captured by continuous recording (when no callback is used)
+        
+        Args:
+            timeout (float): Maximum time to wait (None to wait indefinitely)
+            
+        Returns:
+            AudioData object or None if nothing was captured in time
+        """
+        return self.audio_buffer.pop(timeout=timeout)
+    
     def _continuous_recording_worker(self, callback_func):
         """Worker function for continuous recording"""
         while self.is_recording:
             try:
+                # capture_live_audio blocks until speech or timeout, so no polling delay is needed
                 audio = self.capture_live_audio(timeout=1, phrase_timeout=0.5)
-                if audio and callback_func:
-                    callback_func(audio)
-                time.sleep(0.1)  # Small delay to prevent excessive CPU usage
+                if audio and not self.audio_buffer.push(audio):
+                    logger.warning("Audio buffer full, dropping captured audio")
             except Exception as e:
                 logger.error(f"Error in continuous recording: {e}")
                 time.sleep(1)  # Wait before retrying
     
+    def _dispatch_worker(self, callback_func):
+        """Worker function that hands captured audio to the callback as soon as it arrives"""
+        while self.is_recording or len(self.audio_buffer):
+            audio = self.audio_buffer.pop(timeout=0.5)
+            if audio is None:
+                continue
+            try:
+                callback_func(audio)
+            except Exception as e:
+                logger.error(f"Error in recording callback: {e}")
+    
     def load_audio_file(self, file_path: str) -> Optional[sr.AudioData]:
         """
         Load audio from file
@@ -237,49 +449,116 @@ class AudioInputHandler:
             logger.error(f"Failed to load audio file {file_path}: {e}")
             return None
     
-    def _load_wav_file(self, file_path: str) -> sr.AudioData:
-        """Load WAV file directly"""
-        with sr.AudioFile(file_path) as source:
-            audio = self.recognizer.record(source)
-        return audio
+    def load_audio_stream(self, stream: BinaryIO, file_ext: str) -> Optional[sr.AudioData]:
+        """
+        Load audio from an in-memory or uploaded file object without writing it to disk
+        
+        WAV is always decoded in memory, and FLAC/OGG are too when soundfile is installed.
+        Other formats need ffmpeg, which reads from a path, so load those with load_audio_file.
+        
+        Args:
+            stream: Seekable binary file object positioned at the start of the audio
+            file_ext (str): File extension, e.g. '.wav'
+            
+        Returns:
+            AudioData object, or None if the format can't be decoded in memory or loading failed
+        """
+        file_ext = file_ext.lower()
+        try:
+            if file_ext == '.wav':
+                return self._load_wav_file(stream)
+            
+            if SOUNDFILE_AVAILABLE and file_ext in _SOUNDFILE_FORMATS:
+                samples, sample_rate = sf.read(stream, dtype='int16', always_2d=True)
+                channels = samples.shape[1]
+                if channels > 1:
+                    samples = (samples.sum(axis=1, dtype=np.int32) // channels).astype('<i2')
+                else:
+                    samples = samples[:, 0]
+                return sr.AudioData(samples.astype('<i2', copy=False).tobytes(), sample_rate, 2)
+            
+        except Exception as e:
+            logger.error(f"Failed to load {file_ext} audio from memory: {e}")
+        
+        return None
+    
+    def load_audio_file_np(self, file_path: str) -> Optional[Tuple[np.ndarray, int]]:
+        """
+        Load audio from file as 16-bit mono samples
+        
+        For 16-bit sources (and anything ffmpeg decodes) the array is a zero-copy view of
+        the decoded buffer; 8-, 24- and 32-bit WAV files are converted to 16-bit first,
+        which copies the samples.
+        
+        Args:
+            file_path (str): Path to audio file
+            
+        Returns:
+            Tuple of (read-only int16 sample array, sample rate), or None if loading failed
+        """
+        audio = self.load_audio_file(file_path)
+        if audio is None:
+            return None
+        
+        # For 16-bit audio get_raw_data hands back the buffer itself and frombuffer
+        # wraps it without copying; other widths come back as a converted copy
+        return np.frombuffer(audio.get_raw_data(convert_width=2), dtype='<i2'), audio.sample_rate
+    
+    def _load_wav_file(self, file_path: Union[str, BinaryIO]) -> sr.AudioData:
+        """Load WAV file (path or file object) directly, downmixing multi-channel 16-bit audio with numpy"""
+        try:
+            with wave.open(file_path, 'rb') as wav_file:
+                channels = wav_file.getnchannels()
+                sample_width = wav_file.getsampwidth()
+                sample_rate = wav_file.getframerate()
+                frames = wav_file.readframes(wav_file.getnframes()) if sample_width == 2 else None
+        except wave.Error:
+            frames = None  # e.g. float or extensible WAV; let speech_recognition handle it
+        
+        if frames is None:
+            if hasattr(file_path, 'seek'):
+                file_path.seek(0)
+            with sr.AudioFile(file_path) as source:
+                return self.recognizer.record(source)
+        
+        if channels > 1:
+            # One vectorized pass: average interleaved channels into mono
+            samples = np.frombuffer(frames, dtype='<i2').reshape(-1, channels)
+            frames = (samples.sum(axis=1, dtype=np.int32) // channels).astype('<i2').tobytes()
+        
+        return sr.AudioData(frames, sample_rate, 2)
     
     def _load_other_audio_file(self, file_path: str) -> sr.AudioData:
-        """Load non-WAV audio file using pydub"""
+        """Load non-WAV audio file by decoding it with ffmpeg straight to memory"""
         try:
             # Check if ffmpeg is available
-            if not which("ffmpeg"):
+            if not _FFMPEG_PATH:
                 raise RuntimeError(
                     "FFmpeg is required to process MP3, M4A, and other audio formats. "
                     "Please install FFmpeg or convert your audio file to WAV format. "
                     "You can convert online at: https://convertio.co/mp3-wav/ or https://cloudconvert.com/mp3-to-wav"
                 )
 
-            # Load audio with pydub
-            audio_segment = AudioSegment.from_file(file_path)
-
-            # Convert to WAV format in memory
-            audio_segment = audio_segment.set_frame_rate(self.sample_rate)
-            audio_segment = audio_segment.set_channels(1)
-            audio_segment = audio_segment.set_sample_width(2)  # 16-bit
-
-            # Export to temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                temp_path = temp_file.name
-                audio_segment.export(temp_path, format="wav")
-
-            try:
-                # Load the temporary WAV file
-                with sr.AudioFile(temp_path) as source:
-                    audio = self.recognizer.record(source)
-                return audio
-            finally:
-                # Clean up temporary file
-                os.unlink(temp_path)
+            # Decode, downmix and resample in a single ffmpeg pass (libswresample), reading
+            # 16-bit mono PCM from stdout. Video, subtitle and data streams (e.g. cover art,
+            # MP4 video tracks) are skipped so only the audio is decoded.
+            result = subprocess.run(
+                [_FFMPEG_PATH, '-nostdin', '-v', 'error', '-i', file_path,
+                 '-vn', '-sn', '-dn',
+                 '-f', 's16le', '-ac', '1', '-ar', str(self.sample_rate), 'pipe:1'],
+                capture_output=True,
+                check=True
+            )
+            return sr.AudioData(result.stdout, self.sample_rate, 2)
 
         except RuntimeError as e:
             # Re-raise our custom error message
             logger.error(str(e))
             raise
+        except subprocess.CalledProcessError as e:
+            error = e.stderr.decode('utf-8', errors='replace').strip()
+            logger.error(f"Failed to convert audio file: {error}")
+            raise RuntimeError(f"Audio conversion failed: {error}")
         except Exception as e:
             logger.error(f"Failed to convert audio file: {e}")
             raise RuntimeError(f"Audio conversion failed: {str(e)}")
@@ -294,16 +573,32 @@ class AudioInputHandler:
             format (str): Audio format ('wav', 'mp3', 'flac', etc.)
         """
         try:
-            if format.lower() == 'wav':
-                # Save as WAV directly
-                wav_data = audio_data.get_wav_data()
+            # 16-32 bit frame_data is signed little-endian PCM, written/piped as-is
+            # (8-bit samples need speech_recognition's sign conversion)
+            native = audio_data.sample_width in _FFMPEG_PCM_FORMATS
+            
+            if format.lower() == 'wav' and native:
+                # Write a prebuilt header followed by the PCM data
                 with open(file_path, 'wb') as f:
-                    f.write(wav_data)
+                    f.write(_wav_header(len(audio_data.frame_data), audio_data.sample_rate, audio_data.sample_width))
+                    f.write(audio_data.frame_data)
+            elif format.lower() == 'wav':
+                with open(file_path, 'wb') as f:
+                    f.write(audio_data.get_wav_data())
             else:
-                # Convert using pydub
-                wav_data = audio_data.get_wav_data()
-                audio_segment = AudioSegment.from_wav(io.BytesIO(wav_data))
-                audio_segment.export(file_path, format=format)
+                # Encode by piping the PCM straight into ffmpeg, in its native sample format
+                if native:
+                    pcm_format, raw_data = _FFMPEG_PCM_FORMATS[audio_data.sample_width], audio_data.frame_data
+                else:
+                    pcm_format, raw_data = 's16le', audio_data.get_raw_data(convert_width=2)
+                subprocess.run(
+                    [_FFMPEG_PATH or 'ffmpeg', '-nostdin', '-v', 'error', '-y',
+                     '-f', pcm_format, '-ar', str(audio_data.sample_rate), '-ac', '1', '-i', 'pipe:0',
+                     '-f', format, file_path],
+                    input=raw_data,
+                    capture_output=True,
+                    check=True
+                )
             
             logger.info(f"Audio saved to {file_path}")
             
@@ -334,6 +629,8 @@ class AudioInputHandler:
         if self.is_recording:
             self.stop_continuous_recording()
         
+        self._stop_vad()
+        
         if self.audio:
             self.audio.terminate()
             logger.info("Audio resources cleaned up")
@@ -0,0 +1,119 @@
+"""
+Ring Buffer Module
+Lock-free single-producer / single-consumer buffer for handing captured audio between threads
+"""
+
+import threading
+from typing import Any, Optional
+
+import numpy as np
+
+
+class SPSCRingBuffer:
+    """
+    Fixed-capacity ring buffer for exactly one producer thread and one consumer thread
+
+    Slots are preallocated. Only the producer writes the head index and only the
+    consumer writes the tail index, so pushes and pops need no mutex (index
+    assignments are atomic under the GIL). An Event wakes the consumer as soon
+    as an item is pushed instead of polling.
+    """
+
+    def __init__(self, capacity: int = 32):
+        """
+        Initialize ring buffer
+
+        Args:
+            capacity (int): Maximum number of items held before pushes are rejected
+        """
+        self.capacity = capacity
+        self._slots = [None] * capacity
+        self._head = 0  # Next slot to write (producer only)
+        self._tail = 0  # Next slot to read (consumer only)
+        self._ready = threading.Event()
+
+    def push(self, item: Any) -> bool:
+        """
+        Add an item (producer thread only)
+
+        Args:
+            item: Item to store
+
+        Returns:
+            bool: False if the buffer is full and the item was dropped
+        """
+        if self._head - self._tail >= self.capacity:
+            return False
+
+        self._write(self._head % self.capacity, item)
+        self._head += 1
+        self._ready.set()
+        return True
+
+    def pop(self, timeout: Optional[float] = None) -> Optional[Any]:
+        """
+        Remove the oldest item, waiting for one if the buffer is empty (consumer thread only)
+
+        Args:
+            timeout (float): Maximum seconds to wait (None to wait indefinitely)
+
+        Returns:
+            The oldest item, or None if the wait timed out
+        """
+        while self._tail == self._head:
+            self._ready.clear()
+            # Re-check after clearing so a push between the check and clear isn't missed
+            if self._tail != self._head:
+                break
+            if not self._ready.wait(timeout):
+                return None
+
+        item = self._read(self._tail % self.capacity)
+        self._tail += 1
+        return item
+
+    def clear(self):
+        """Discard every buffered item (consumer thread only)"""
+        self._tail = self._head
+
+    def _write(self, index: int, item: Any):
+        """Store an item in a slot"""
+        self._slots[index] = item
+
+    def _read(self, index: int) -> Any:
+        """Take the item out of a slot"""
+        item = self._slots[index]
+        self._slots[index] = None
+        return item
+
+    def __len__(self) -> int:
+        return self._head - self._tail
+
+
+class FrameRingBuffer(SPSCRingBuffer):
+    """
+    SPSC ring buffer of fixed-size audio frames stored in one preallocated array
+
+    Pushing copies the frame into its row, so a real-time audio callback can hand
+    over frames without allocating Python objects to hold them.
+    """
+
+    def __init__(self, capacity: int, frame_size: int, dtype=np.int16):
+        """
+        Initialize frame ring buffer
+
+        Args:
+            capacity (int): Number of frames held before pushes are rejected
+            frame_size (int): Samples per frame
+            dtype: Sample type
+        """
+        super().__init__(capacity)
+        self._slots = np.empty((capacity, frame_size), dtype=dtype)
+
+    def _write(self, index: int, item: Any):
+        """Copy a frame (array or raw buffer of samples) into its row"""
+        self._slots[index] = np.frombuffer(item, dtype=self._slots.dtype)
+
+    def _read(self, index: int) -> np.ndarray:
+        """Copy a frame out, since the row is reused once the tail moves on"""
+        return self._slots[index].copy()
@@ -0,0 +1,249 @@
+"""
+VAD Capture Module
+Low-latency microphone capture using a PortAudio callback stream and per-frame voice activity detection
+"""
+
+import os
+import logging
+from collections import deque
+from typing import Optional
+
+import numpy as np
+import speech_recognition as sr
+
+from .ring_buffer import FrameRingBuffer
+
+# Optional sounddevice import
+try:
+    import sounddevice as sd
+    SOUNDDEVICE_AVAILABLE = True
+except (ImportError, OSError):
+    SOUNDDEVICE_AVAILABLE = False
+    sd = None
+
+# Optional webrtcvad import
+try:
+    import webrtcvad
+    WEBRTCVAD_AVAILABLE = True
+except ImportError:
+    WEBRTCVAD_AVAILABLE = False
+    webrtcvad = None
+
+# Without webrtcvad, frames are gated on their RMS energy instead
+VAD_CAPTURE_AVAILABLE = SOUNDDEVICE_AVAILABLE
+
+# Sample rates supported by webrtcvad
+VAD_SAMPLE_RATES = (8000, 16000, 32000, 48000)
+
+# Set up logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def frame_rms(frame: np.ndarray) -> float:
+    """
+    Compute the RMS energy of an int16 frame in one vectorized pass
+
+    Args:
+        frame (np.ndarray): int16 samples
+
+    Returns:
+        float: Root mean square amplitude
+    """
+    # Square in int32 so full-scale samples don't overflow
+    return float(np.sqrt(np.mean(np.square(frame, dtype=np.int32))))
+
+
+def find_input_device(name: str) -> Optional[int]:
+    """
+    Find the sounddevice index of an input device by name
+
+    PyAudio and sounddevice each enumerate PortAudio devices through their own
+    bundled library, so indices from one aren't guaranteed to match the other.
+
+    Args:
+        name (str): Device name as reported by PyAudio
+
+    Returns:
+        int: sounddevice device index, or None if no input device matches
+    """
+    inputs = [(i, info['name']) for i, info in enumerate(sd.query_devices()) if info['max_input_channels'] > 0]
+    for i, device_name in inputs:
+        if device_name == name:
+            return i
+    # Host APIs sometimes add or drop a suffix such as "(hw:1,0)"
+    for i, device_name in inputs:
+        if name in device_name or device_name in name:
+            return i
+    return None
+
+
+class VADCapture:
+    """
+    Microphone capture that segments utterances with a voice activity detector
+
+    PortAudio delivers fixed 30 ms frames to a callback that only copies them into a
+    preallocated ring buffer. The consumer runs the C-level VAD on each frame, so speech
+    start and end are detected per frame instead of by recognizer.listen's Python
+    energy loop over the blocking stream. When webrtcvad is not installed (or the
+    sample rate isn't one it supports), frames are gated on their numpy RMS energy.
+    """
+
+    FRAME_MS = 30  # webrtcvad accepts 10, 20 or 30 ms frames
+    PREROLL_MS = 300  # Audio kept from before speech onset so first syllables aren't clipped
+
+    def __init__(self, sample_rate: int = 16000, device: Optional[int] = None, aggressiveness: int = None,
+                 energy_threshold: float = 300, buffer_seconds: int = 10):
+        """
+        Initialize VAD capture
+
+        Args:
+            sample_rate (int): Sample rate (webrtcvad supports 8000, 16000, 32000 or 48000)
+            device (int): Input device index (None for default)
+            aggressiveness (int): VAD aggressiveness 0-3 (default from env or 2)
+            energy_threshold (float): RMS level treated as speech when gating on energy
+            buffer_seconds (int): Seconds of audio the ring buffer can hold
+        """
+        self.sample_rate = sample_rate
+        self.device = device
+        self.frame_size = sample_rate * self.FRAME_MS // 1000
+        self.frames = FrameRingBuffer(
+            capacity=buffer_seconds * 1000 // self.FRAME_MS,
+            frame_size=self.frame_size
+        )
+        self.overflows = 0  # Frames dropped because the consumer fell behind
+
+        self.energy_threshold = energy_threshold
+        if WEBRTCVAD_AVAILABLE and sample_rate in VAD_SAMPLE_RATES:
+            if aggressiveness is None:
+                aggressiveness = int(os.getenv('VAD_AGGRESSIVENESS', '2'))
+            self.vad = webrtcvad.Vad(aggressiveness)
+        else:
+            self.vad = None
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        """PortAudio callback: copy the frame into the ring and return immediately"""
+        if not self.frames.push(indata):
+            self.overflows += 1
+
+    def start(self):
+        """Open and start the input stream if it isn't running"""
+        if self._stream is not None:
+            return
+
+        self._stream = sd.RawInputStream(
+            samplerate=self.sample_rate,
+            blocksize=self.frame_size,
+            device=self.device,
+            channels=1,
+            dtype='int16',
+            callback=self._callback
+        )
+        self._stream.start()
+        logger.info("VAD capture stream started (%d ms frames)", self.FRAME_MS)
+
+    def stop(self):
+        """Stop and close the input stream"""
+        if self._stream is not None:
+            stream, self._stream = self._stream, None
+            stream.stop()
+            stream.close()
+            logger.info("VAD capture stream stopped")
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        """
+        Check whether a frame contains speech
+
+        Args:
+            frame (np.ndarray): One frame of int16 samples
+
+        Returns:
+            bool: True if the VAD classifies the frame as speech
+        """
+        if self.vad is None:
+            return frame_rms(frame) > self.energy_threshold
+        return self.vad.is_speech(frame.tobytes(), self.sample_rate)
+
+    def calibrate(self, duration: float = 1.0, multiplier: float = 1.5) -> float:
+        """
+        Set the energy threshold from ambient noise (only used when gating on energy)
+
+        Args:
+            duration (float): Seconds of ambient audio to measure
+            multiplier (float): Headroom above the ambient level
+
+        Returns:
+            float: New energy threshold
+        """
+        self.start()
+        self.frames.clear()
+
+        levels = []
+        for _ in range(max(1, int(duration * 1000 / self.FRAME_MS))):
+            frame = self.frames.pop(timeout=1.0)
+            if frame is None:
+                break
+            levels.append(frame_rms(frame))
+
+        if levels:
+            self.energy_threshold = float(np.mean(levels)) * multiplier
+        logger.info("VAD capture energy threshold: %.1f", self.energy_threshold)
+        return self.energy_threshold
+
+    def capture(self, timeout: float = None, phrase_time_limit: float = None,
+                pause_threshold: float = 0.8) -> sr.AudioData:
+        """
+        Capture one utterance
+
+        Args:
+            timeout (float): Maximum seconds to wait for speech to start (None for no timeout)
+            phrase_time_limit (float): Maximum seconds of speech to record (None for no limit)
+            pause_threshold (float): Seconds of non-speech that end the utterance
+
+        Returns:
+            AudioData object containing the utterance
+
+        Raises:
+            sr.WaitTimeoutError: If no speech started within timeout
+        """
+        self.start()
+        # Drop audio buffered while nobody was listening
+        self.frames.clear()
+
+        wait_limit = int(timeout * 1000 / self.FRAME_MS) if timeout else None
+        phrase_limit = int(phrase_time_limit * 1000 / self.FRAME_MS) if phrase_time_limit else None
+        pause_limit = max(1, int(pause_threshold * 1000 / self.FRAME_MS))
+
+        preroll = deque(maxlen=self.PREROLL_MS // self.FRAME_MS)
+        voiced = []
+        waited = 0
+        spoken = 0
+        silent = 0
+
+        while True:
+            frame = self.frames.pop(timeout=1.0)
+            if frame is None:
+                raise sr.WaitTimeoutError("audio stream stopped delivering frames")
+
+            speech = self.is_speech(frame)
+
+            if not voiced:
+                if speech:
+                    voiced.extend(preroll)
+                    voiced.append(frame)
+                    spoken = 1
+                else:
+                    preroll.append(frame)
+                    waited += 1
+                    if wait_limit is not None and waited >= wait_limit:
+                        raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                continue
+
+            voiced.append(frame)
+            spoken += 1
+            silent = 0 if speech else silent + 1
+            if silent >= pause_limit or (phrase_limit is not None and spoken >= phrase_limit):
+                break
+
+        return sr.AudioData(np.concatenate(voiced).tobytes(), self.sample_rate, 2)
@@ -4,16 +4,123 @@ Formats and presents AI analysis results in user-friendly ways
 """
 
 import json
+import time
 import logging
 from datetime import datetime
-from typing import Dict, Any, List, Optional
-import textwrap
+from typing import Dict, Any, List, Optional, Union
 from dataclasses import dataclass
 
+# Optional orjson import (C JSON encoder, much faster than json.dumps with indent)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Icons for format_system_message
+_ICONS = {
+    'info': 'ℹ️',
+    'warning': '⚠️',
+    'success': '✅',
+    'error': '❌'
+}
+
+
+def _dumps(obj: Any, indent: bool = True) -> str:
+    """
+    Serialize to a JSON string, with orjson when available
+    
+    Args:
+        obj: Object to serialize
+        indent (bool): Pretty-print with 2-space indentation
+        
+    Returns:
+        str: JSON text (non-ASCII characters are written as-is)
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option).decode('utf-8')
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False)
+
+
+def to_iso_timestamp(timestamp: Optional[Union[float, str]]) -> Optional[str]:
+    """
+    Convert a timestamp to an ISO 8601 string
+    
+    Args:
+        timestamp: Epoch seconds (as produced by AIAnalyzer), an ISO string, or None
+        
+    Returns:
+        Optional[str]: ISO 8601 timestamp, or None when no timestamp was given
+    """
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp).isoformat()
+    return timestamp
+
+
+def to_datetime(timestamp: Optional[Union[float, str, datetime]] = None) -> datetime:
+    """
+    Convert a timestamp to a datetime
+    
+    Args:
+        timestamp: Epoch seconds, an ISO string, a datetime, or None for now
+        
+    Returns:
+        datetime: Parsed timestamp
+    """
+    if timestamp is None:
+        return datetime.now()
+    if isinstance(timestamp, datetime):
+        return timestamp
+    if isinstance(timestamp, (int, float)):
+        return datetime.fromtimestamp(timestamp)
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+
+
+def wrap_text(text: str, width: int, indent: str = "") -> str:
+    """
+    Greedy word wrap, like textwrap.fill with the same initial and subsequent indent
+    (but without splitting on hyphens)
+    
+    Args:
+        text (str): Text to wrap
+        width (int): Maximum line width, including the indent
+        indent (str): Prefix for every line
+        
+    Returns:
+        str: Wrapped text
+    """
+    available = max(width - len(indent), 1)
+    lines = []
+    current = []
+    current_len = 0
+    
+    for word in text.split():
+        while True:
+            space_left = available - current_len - (1 if current else 0)
+            if len(word) <= space_left:
+                current.append(word)
+                current_len += len(word) + (1 if len(current) > 1 else 0)
+                break
+            if len(word) > available and space_left > 0:
+                # Words longer than a line fill the rest of the line, as textwrap does
+                current.append(word[:space_left])
+                word = word[space_left:]
+            lines.append(indent + " ".join(current))
+            current, current_len = [], 0
+    
+    if current:
+        lines.append(indent + " ".join(current))
+    
+    return "\n".join(lines)
+
 
 @dataclass
 class FormattedOutput:
@@ -21,7 +128,7 @@ class FormattedOutput:
     transcribed_text: str
     ai_response: str
     analysis_data: Dict[str, Any]
-    timestamp: str
+    timestamp: datetime
     formatted_display: str
     json_data: str
 
@@ -44,6 +151,8 @@ class OutputFormatter:
         # Display configuration
         self.max_line_width = 80
         self.indent_size = 2
+        self._eq_bar = "=" * self.max_line_width
+        self._dash_bar = "-" * 40
         
         logger.info(f"Output formatter initialized with style: {output_style}")
     
@@ -64,7 +173,7 @@ class OutputFormatter:
                 transcribed_text=transcribed_text,
                 ai_response=ai_analysis.get('response', ''),
                 analysis_data=ai_analysis.get('analysis', {}),
-                timestamp=ai_analysis.get('timestamp', datetime.now().isoformat()),
+                timestamp=to_datetime(ai_analysis.get('timestamp')),
                 formatted_display='',
                 json_data=''
             )
@@ -93,103 +202,66 @@ class OutputFormatter:
     def _format_conversational(self, output: FormattedOutput) -> str:
         """Format output in conversational style"""
         
-        lines = []
-        
-        # Header with timestamp
-        time_str = datetime.fromisoformat(output.timestamp.replace('Z', '+00:00')).strftime('%H:%M:%S')
-        lines.append(f"🎤 [{time_str}] You said:")
-        lines.append(f"   \"{output.transcribed_text}\"")
-        lines.append("")
-        
-        # AI Response
-        lines.append("🤖 AI Response:")
-        wrapped_response = textwrap.fill(
-            output.ai_response, 
-            width=self.max_line_width - 3,
-            initial_indent="   ",
-            subsequent_indent="   "
+        time_str = output.timestamp.strftime('%H:%M:%S')
+        wrapped_response = wrap_text(output.ai_response, width=self.max_line_width - 3, indent="   ")
+        display = (
+            f'🎤 [{time_str}] You said:\n'
+            f'   "{output.transcribed_text}"\n'
+            f'\n'
+            f'🤖 AI Response:\n'
+            f'{wrapped_response}'
         )
-        lines.append(wrapped_response)
         
         # Quick analysis summary (if available)
-        if output.analysis_data:
-            lines.append("")
-            lines.append("📊 Quick Analysis:")
-            
-            # Word count
-            if 'word_count' in output.analysis_data:
-                lines.append(f"   • Words spoken: {output.analysis_data['word_count']}")
-            
-            # Topics
-            if 'topics' in output.analysis_data and output.analysis_data['topics']:
-                topics_str = ", ".join(output.analysis_data['topics'])
-                lines.append(f"   • Topics: {topics_str}")
-            
-            # Question/exclamation indicators
-            if output.analysis_data.get('contains_question'):
-                lines.append("   • Contains question")
-            if output.analysis_data.get('contains_exclamation'):
-                lines.append("   • Contains exclamation")
-        
-        return "\n".join(lines)
+        data = output.analysis_data
+        if data:
+            word_count = f"\n   • Words spoken: {data['word_count']}" if 'word_count' in data else ""
+            topics = f"\n   • Topics: {', '.join(data['topics'])}" if data.get('topics') else ""
+            question = "\n   • Contains question" if data.get('contains_question') else ""
+            exclamation = "\n   • Contains exclamation" if data.get('contains_exclamation') else ""
+            display += f"\n\n📊 Quick Analysis:{word_count}{topics}{question}{exclamation}"
+        
+        return display
     
     def _format_detailed(self, output: FormattedOutput) -> str:
         """Format output with detailed analysis"""
         
-        lines = []
-        
-        # Header
-        lines.append("=" * self.max_line_width)
-        lines.append("SPEECH-TO-TEXT AI ANALYSIS REPORT")
-        lines.append("=" * self.max_line_width)
-        lines.append(f"Timestamp: {output.timestamp}")
-        lines.append("")
-        
-        # Input Section
-        lines.append("📝 TRANSCRIBED INPUT:")
-        lines.append("-" * 40)
-        wrapped_input = textwrap.fill(
-            f'"{output.transcribed_text}"',
-            width=self.max_line_width,
-            initial_indent="",
-            subsequent_indent=""
-        )
-        lines.append(wrapped_input)
-        lines.append("")
-        
-        # AI Response Section
-        lines.append("🤖 AI RESPONSE:")
-        lines.append("-" * 40)
-        wrapped_response = textwrap.fill(
-            output.ai_response,
-            width=self.max_line_width,
-            initial_indent="",
-            subsequent_indent=""
-        )
-        lines.append(wrapped_response)
-        lines.append("")
+        wrapped_input = wrap_text(f'"{output.transcribed_text}"', width=self.max_line_width)
+        wrapped_response = wrap_text(output.ai_response, width=self.max_line_width)
         
         # Detailed Analysis Section
+        analysis_section = ""
         if output.analysis_data:
-            lines.append("📊 DETAILED ANALYSIS:")
-            lines.append("-" * 40)
-            
-            for key, value in output.analysis_data.items():
-                if isinstance(value, (list, dict)):
-                    lines.append(f"{key.replace('_', ' ').title()}:")
-                    if isinstance(value, list):
-                        for item in value:
-                            lines.append(f"  • {item}")
-                    else:
-                        for sub_key, sub_value in value.items():
-                            lines.append(f"  • {sub_key}: {sub_value}")
-                else:
-                    lines.append(f"{key.replace('_', ' ').title()}: {value}")
-            lines.append("")
-        
-        lines.append("=" * self.max_line_width)
-        
-        return "\n".join(lines)
+            items = "\n".join(self._format_detail_item(key, value) for key, value in output.analysis_data.items())
+            analysis_section = f"📊 DETAILED ANALYSIS:\n{self._dash_bar}\n{items}\n\n"
+        
+        return (
+            f"{self._eq_bar}\n"
+            f"SPEECH-TO-TEXT AI ANALYSIS REPORT\n"
+            f"{self._eq_bar}\n"
+            f"Timestamp: {output.timestamp.isoformat()}\n"
+            f"\n"
+            f"📝 TRANSCRIBED INPUT:\n"
+            f"{self._dash_bar}\n"
+            f"{wrapped_input}\n"
+            f"\n"
+            f"🤖 AI RESPONSE:\n"
+            f"{self._dash_bar}\n"
+            f"{wrapped_response}\n"
+            f"\n"
+            f"{analysis_section}"
+            f"{self._eq_bar}"
+        )
+    
+    @staticmethod
+    def _format_detail_item(key: str, value: Any) -> str:
+        """Format one analysis field for the detailed report"""
+        label = key.replace('_', ' ').title()
+        if isinstance(value, list):
+            return f"{label}:" + "".join(f"\n  • {item}" for item in value)
+        if isinstance(value, dict):
+            return f"{label}:" + "".join(f"\n  • {sub_key}: {sub_value}" for sub_key, sub_value in value.items())
+        return f"{label}: {value}"
     
     def _format_minimal(self, output: FormattedOutput) -> str:
         """Format output in minimal style"""
@@ -200,7 +272,7 @@ class OutputFormatter:
         """Format output as JSON"""
         
         json_data = {
-            'timestamp': output.timestamp,
+            'timestamp': output.timestamp.isoformat(),
             'input': {
                 'transcribed_text': output.transcribed_text,
                 'word_count': len(output.transcribed_text.split())
@@ -209,7 +281,7 @@ class OutputFormatter:
             'analysis': output.analysis_data
         }
         
-        return json.dumps(json_data, indent=2, ensure_ascii=False)
+        return _dumps(json_data)
     
     def format_error(self, error_message: str, context: Optional[str] = None) -> str:
         """
@@ -231,7 +303,7 @@ class OutputFormatter:
                 'context': context,
                 'timestamp': datetime.now().isoformat()
             }
-            return json.dumps(error_data, indent=2)
+            return _dumps(error_data)
         
         lines.append("❌ ERROR:")
         lines.append(f"   {error_message}")
@@ -239,7 +311,7 @@ class OutputFormatter:
         if context:
             lines.append(f"   Context: {context}")
         
-        lines.append(f"   Time: {datetime.now().strftime('%H:%M:%S')}")
+        lines.append(f"   Time: {time.strftime('%H:%M:%S')}")
         
         return "\n".join(lines)
     
@@ -261,19 +333,10 @@ class OutputFormatter:
                 'message': message,
                 'timestamp': datetime.now().isoformat()
             }
-            return json.dumps(system_data, indent=2)
-        
-        icons = {
-            'info': 'ℹ️',
-            'warning': '⚠️',
-            'success': '✅',
-            'error': '❌'
-        }
+            return _dumps(system_data)
         
-        icon = icons.get(message_type, 'ℹ️')
-        time_str = datetime.now().strftime('%H:%M:%S')
-        
-        return f"{icon} [{time_str}] {message}"
+        # time.strftime formats the local time without building a datetime
+        return f"{_ICONS.get(message_type, 'ℹ️')} [{time.strftime('%H:%M:%S')}] {message}"
     
     def get_session_summary(self) -> str:
         """
@@ -286,18 +349,15 @@ class OutputFormatter:
             return self.format_system_message("No interactions in this session yet.", 'info')
         
         total_interactions = len(self.session_outputs)
-        total_words_spoken = sum(
-            len(output.transcribed_text.split()) 
-            for output in self.session_outputs
-        )
+        total_words_spoken = 0
+        seen_topics = {}  # Insertion-ordered set: topics in order of first mention
         
-        # Collect all topics
-        all_topics = []
+        # Single pass: count words and collect unique topics
         for output in self.session_outputs:
-            if 'topics' in output.analysis_data:
-                all_topics.extend(output.analysis_data['topics'])
+            total_words_spoken += len(output.transcribed_text.split())
+            seen_topics.update(dict.fromkeys(output.analysis_data.get('topics', ())))
         
-        unique_topics = list(set(all_topics))
+        unique_topics = list(seen_topics)
         
         if self.output_style == 'json':
             summary_data = {
@@ -305,10 +365,10 @@ class OutputFormatter:
                 'total_interactions': total_interactions,
                 'total_words_spoken': total_words_spoken,
                 'unique_topics': unique_topics,
-                'session_start': self.session_outputs[0].timestamp if self.session_outputs else None,
-                'session_end': self.session_outputs[-1].timestamp if self.session_outputs else None
+                'session_start': self.session_outputs[0].timestamp.isoformat(),
+                'session_end': self.session_outputs[-1].timestamp.isoformat()
             }
-            return json.dumps(summary_data, indent=2)
+            return _dumps(summary_data)
         
         lines = []
         lines.append("📈 SESSION SUMMARY:")
@@ -321,11 +381,8 @@ class OutputFormatter:
                 topics_str += f" (and {len(unique_topics) - 5} more)"
             lines.append(f"   • Topics discussed: {topics_str}")
         
-        if self.session_outputs:
-            start_time = datetime.fromisoformat(self.session_outputs[0].timestamp.replace('Z', '+00:00'))
-            end_time = datetime.fromisoformat(self.session_outputs[-1].timestamp.replace('Z', '+00:00'))
-            duration = end_time - start_time
-            lines.append(f"   • Session duration: {duration}")
+        duration = self.session_outputs[-1].timestamp - self.session_outputs[0].timestamp
+        lines.append(f"   • Session duration: {duration}")
         
         return "\n".join(lines)
     
@@ -342,24 +399,29 @@ class OutputFormatter:
         """
         try:
             if format == 'json':
-                session_data = {
-                    'session_info': {
-                        'total_interactions': len(self.session_outputs),
-                        'export_timestamp': datetime.now().isoformat()
-                    },
-                    'interactions': [
-                        {
-                            'timestamp': output.timestamp,
-                            'transcribed_text': output.transcribed_text,
-                            'ai_response': output.ai_response,
-                            'analysis': output.analysis_data
-                        }
-                        for output in self.session_outputs
-                    ]
+                session_info = {
+                    'total_interactions': len(self.session_outputs),
+                    'export_timestamp': datetime.now().isoformat()
                 }
                 
+                # Stream one interaction at a time instead of building the whole document,
+                # re-indenting each one so the file matches json.dump(..., indent=2)
+                # (JSON strings never contain a raw newline, so this only touches layout)
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    json.dump(session_data, f, indent=2, ensure_ascii=False)
+                    f.write('{\n  "session_info": ')
+                    f.write(_dumps(session_info, indent=True).replace('\n', '\n  '))
+                    f.write(',\n  "interactions": [')
+                    
+                    for i, output in enumerate(self.session_outputs):
+                        f.write(',\n    ' if i else '\n    ')
+                        f.write(_dumps({
+                            'timestamp': output.timestamp.isoformat(),
+                            'transcribed_text': output.transcribed_text,
+                            'ai_response': output.ai_response,
+                            'analysis': output.analysis_data
+                        }, indent=True).replace('\n', '\n    '))
+                    
+                    f.write('\n  ]\n}' if self.session_outputs else ']\n}')
             
             elif format == 'txt':
                 with open(file_path, 'w', encoding='utf-8') as f:
@@ -368,7 +430,7 @@ class OutputFormatter:
                     
                     for i, output in enumerate(self.session_outputs, 1):
                         f.write(f"INTERACTION {i}\n")
-                        f.write(f"Time: {output.timestamp}\n")
+                        f.write(f"Time: {output.timestamp.isoformat()}\n")
                         f.write(f"Input: {output.transcribed_text}\n")
                         f.write(f"AI Response: {output.ai_response}\n")
                         f.write("-" * 30 + "\n\n")
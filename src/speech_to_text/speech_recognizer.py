@@ -3,44 +3,147 @@ Speech Recognition Module
 Handles conversion of audio to text using multiple recognition engines
 """
 
+import io
 import os
-import speech_recognition as sr
+import sys
+import functools
+import importlib.util
 import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+import speech_recognition as sr
 import numpy as np
 from typing import Optional, Union
 import logging
 
-# Optional whisper import
+
+def _lazy_import(name: str):
+    """
+    Import a module whose code only runs on first attribute access (CPython LazyLoader recipe)
+    
+    Args:
+        name (str): Top-level module name
+        
+    Returns:
+        The (lazy) module, or None if it isn't installed
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None or spec.loader is None:
+        return None
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+# Optional whisper and torch imports. Loading them takes seconds, so they're found now and
+# only executed when first used (never, for the google/azure engines)
+whisper = _lazy_import('whisper')
+WHISPER_AVAILABLE = whisper is not None
+
+# torch is installed alongside whisper; used for device selection and quantization
+torch = _lazy_import('torch')
+TORCH_AVAILABLE = torch is not None
+
+# Optional faster-whisper import (CTranslate2 backend with int8 kernels)
 try:
-    import whisper
-    WHISPER_AVAILABLE = True
+    from faster_whisper import WhisperModel
+    import ctranslate2
+    FASTER_WHISPER_AVAILABLE = True
 except ImportError:
-    WHISPER_AVAILABLE = False
-    whisper = None
+    FASTER_WHISPER_AVAILABLE = False
+    WhisperModel = None
+    ctranslate2 = None
+
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Whisper's expected input sample rate
+WHISPER_SAMPLE_RATE = 16000
+
+# Silero VAD (TorchScript file) used to cut silence before Whisper; disabled when unset
+SILERO_VAD_PATH = os.getenv('SILERO_VAD_PATH')
+VAD_WINDOW = 512  # Samples per Silero window at 16 kHz (32 ms)
+VAD_THRESHOLD = 0.5  # Speech probability a window needs to be kept
+VAD_PAD_WINDOWS = 6  # Windows kept either side of speech so word edges aren't clipped
+
+# Loaded Whisper models, shared by every SpeechRecognizer in the process
+_whisper_models = {}
+_whisper_models_lock = threading.Lock()
+
+
+def audio_data_to_float32(audio_data: sr.AudioData) -> np.ndarray:
+    """
+    Convert AudioData to the float32 waveform Whisper takes, without a WAV round-trip
+    
+    Args:
+        audio_data: AudioData object
+        
+    Returns:
+        np.ndarray: Mono float32 samples in [-1, 1) at 16 kHz
+    """
+    # 16 kHz 16-bit audio comes back as the original buffer, with no conversion
+    raw = audio_data.get_raw_data(convert_rate=WHISPER_SAMPLE_RATE, convert_width=2)
+    samples = np.frombuffer(raw, dtype='<i2').astype(np.float32)
+    # Scale in place: astype already made the one float32 copy we return
+    samples *= 1.0 / 32768.0
+    return samples
+
+
+@functools.lru_cache(maxsize=1)
+def _load_silero_vad(path: str):
+    """Load the Silero VAD TorchScript model once per process"""
+    model = torch.jit.load(path, map_location='cpu')
+    model.eval()
+    logger.info("Silero VAD loaded")
+    return model
+
 
 class SpeechRecognizer:
     """
     Speech recognition class supporting multiple engines:
     - Google Speech Recognition (online)
-    - OpenAI Whisper (offline)
+    - OpenAI Whisper (offline, via faster-whisper or openai-whisper)
     - Azure Speech Services (online)
     """
     
-    def __init__(self, engine='whisper', whisper_model='base'):
+    def __init__(self, engine='whisper', whisper_model='base', quantize: bool = None, whisper_backend: str = None,
+                 compile_encoder: bool = None):
         """
         Initialize speech recognizer
         
         Args:
             engine (str): Recognition engine ('whisper', 'google', 'azure')
             whisper_model (str): Whisper model size ('tiny', 'base', 'small', 'medium', 'large')
+            quantize (bool): Run Whisper with int8 weights on CPU (default from env or True)
+            whisper_backend (str): 'faster-whisper' or 'openai-whisper' (default from env, or
+                faster-whisper when installed)
+            compile_encoder (bool): torch.compile the openai-whisper encoder (default from env or False)
         """
+        if quantize is None:
+            quantize = os.getenv('WHISPER_QUANTIZE', 'true').lower() == 'true'
+        if compile_encoder is None:
+            compile_encoder = os.getenv('WHISPER_COMPILE', 'false').lower() == 'true'
+        self.compile_encoder = compile_encoder and TORCH_AVAILABLE and hasattr(torch, 'compile')
+        
+        self.whisper_backend = whisper_backend or os.getenv(
+            'WHISPER_BACKEND', 'faster-whisper' if FASTER_WHISPER_AVAILABLE else 'openai-whisper'
+        )
+        if self.whisper_backend == 'faster-whisper' and not FASTER_WHISPER_AVAILABLE:
+            logger.warning("faster-whisper not available, using openai-whisper")
+            self.whisper_backend = 'openai-whisper'
+        
         self.engine = engine
         self.recognizer = sr.Recognizer()
+        self._executor = None  # Transcription worker thread, started on first submit
+        self._available_engines = self._detect_engines()
+        self._executor_lock = threading.Lock()
         
         # Configure recognition settings
         self.recognizer.energy_threshold = 300
@@ -50,11 +153,10 @@ class SpeechRecognizer:
         
         # Initialize Whisper if selected and available
         if engine == 'whisper':
-            if WHISPER_AVAILABLE:
+            if self.whisper_backend == 'faster-whisper' or WHISPER_AVAILABLE:
                 try:
                     logger.info(f"Loading Whisper model: {whisper_model}")
-                    self.whisper_model = whisper.load_model(whisper_model)
-                    logger.info("Whisper model loaded successfully")
+                    self.whisper_model = self._get_whisper_model(whisper_model, quantize)
                 except Exception as e:
                     logger.error(f"Failed to load Whisper model: {e}")
                     self.whisper_model = None
@@ -62,33 +164,204 @@ class SpeechRecognizer:
                 logger.warning("Whisper not available, falling back to Google Speech Recognition")
                 self.engine = 'google'
                 self.whisper_model = None
+        
+        # Voice activity detection to drop silence before Whisper sees it
+        self.vad_model = None
+        if self.engine == 'whisper' and SILERO_VAD_PATH and TORCH_AVAILABLE:
+            try:
+                self.vad_model = _load_silero_vad(SILERO_VAD_PATH)
+            except Exception as e:
+                logger.error(f"Failed to load Silero VAD, transcribing without it: {e}")
+        
+        # Resolve the engine's transcription method once instead of branching per call
+        self._transcribe_fn = {
+            'whisper': self._transcribe_with_whisper,
+            'google': self._transcribe_with_google,
+            'azure': self._transcribe_with_azure
+        }.get(self.engine)
+    
+    @functools.cached_property
+    def whisper_device(self) -> str:
+        """
+        Device for openai-whisper: the GPU (in fp16) when CUDA is available, else the CPU
+        
+        Resolved on first use, so the google and azure engines never execute the lazy torch import.
+        """
+        return 'cuda' if TORCH_AVAILABLE and torch.cuda.is_available() else 'cpu'
+    
+    def _get_whisper_model(self, whisper_model: str, quantize: bool):
+        """
+        Get a Whisper model, loading it only the first time it is requested in this process
+        
+        Args:
+            whisper_model (str): Whisper model size
+            quantize (bool): Apply dynamic int8 quantization when running on CPU
+            
+        Returns:
+            Loaded Whisper model
+        """
+        key = (self.whisper_backend, whisper_model, quantize)
+        if self.whisper_backend == 'openai-whisper':
+            # Only the torch backend depends on these; faster-whisper must not import torch
+            key += (self.whisper_device, self.compile_encoder)
+        with _whisper_models_lock:
+            if key not in _whisper_models:
+                _whisper_models[key] = self._load_whisper_model(whisper_model, quantize)
+                logger.info("Whisper model loaded successfully")
+            else:
+                logger.info("Reusing loaded Whisper model")
+            return _whisper_models[key]
+    
+    def _load_whisper_model(self, whisper_model: str, quantize: bool):
+        """
+        Load a Whisper model, quantizing it to int8 on CPU
+        
+        Args:
+            whisper_model (str): Whisper model size
+            quantize (bool): Use int8 weights when running on CPU
+            
+        Returns:
+            Loaded Whisper model
+        """
+        if self.whisper_backend == 'faster-whisper':
+            if ctranslate2.get_cuda_device_count() > 0:
+                compute_type = 'float16'
+            else:
+                compute_type = 'int8' if quantize else 'float32'
+            return WhisperModel(whisper_model, device='auto', compute_type=compute_type)
+        
+        if self.whisper_device == 'cuda' or not (quantize and TORCH_AVAILABLE):
+            model = whisper.load_model(whisper_model, device=self.whisper_device)
+        else:
+            # whisper.model.Linear is an nn.Linear subclass, and quantize_dynamic only swaps
+            # exact type matches, so build the model with plain nn.Linear layers instead
+            # (equivalent on CPU, where weights and activations are both fp32)
+            whisper_linear = whisper.model.Linear
+            whisper.model.Linear = torch.nn.Linear
+            try:
+                model = whisper.load_model(whisper_model, device='cpu')
+            finally:
+                whisper.model.Linear = whisper_linear
+            
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            logger.info("Whisper model quantized to int8")
+        
+        if self.compile_encoder:
+            # The encoder always sees a fixed 30 s mel window, so one static graph covers
+            # every call; on CUDA, reduce-overhead also replays it as a CUDA graph
+            mode = 'reduce-overhead' if self.whisper_device == 'cuda' else 'default'
+            model.encoder = torch.compile(model.encoder, mode=mode, dynamic=False)
+            logger.info(f"Whisper encoder compiled (mode={mode})")
+        
+        # Load the (lru_cached) mel filterbank now rather than on the first request
+        whisper.audio.mel_filters(model.device, model.dims.n_mels)
+        
+        return model
     
-    def transcribe_audio(self, audio_data: Union[sr.AudioData, str, np.ndarray]) -> str:
+    def transcribe_audio(self, audio_data: Union[sr.AudioData, str, np.ndarray, bytes]) -> str:
         """
         Transcribe audio data to text
         
         Args:
-            audio_data: Audio data (AudioData object, file path, or numpy array)
+            audio_data: Audio data (AudioData object, file path, numpy array, or encoded file bytes)
             
         Returns:
             str: Transcribed text
         """
         try:
-            if self.engine == 'whisper':
-                return self._transcribe_with_whisper(audio_data)
-            elif self.engine == 'google':
-                return self._transcribe_with_google(audio_data)
-            elif self.engine == 'azure':
-                return self._transcribe_with_azure(audio_data)
-            else:
+            if self._transcribe_fn is None:
                 raise ValueError(f"Unsupported engine: {self.engine}")
-                
+            return self._transcribe_fn(audio_data)
+            
         except Exception as e:
             logger.error(f"Transcription failed: {e}")
             return ""
     
-    def _transcribe_with_whisper(self, audio_data: Union[sr.AudioData, str, np.ndarray]) -> str:
-        """Transcribe using OpenAI Whisper (offline)"""
+    def _run_whisper(self, audio: Union[str, np.ndarray]) -> str:
+        """
+        Run the loaded Whisper model on a file path or 16 kHz float32 array
+        
+        Args:
+            audio: File path or float32 samples
+            
+        Returns:
+            str: Transcribed text
+        """
+        if self.vad_model is not None and isinstance(audio, np.ndarray):
+            audio = self._trim_silence(audio)
+            if not audio.size:
+                return ""
+        
+        if self.whisper_backend == 'faster-whisper':
+            segments, _ = self.whisper_model.transcribe(audio)
+            return "".join(segment.text for segment in segments).strip()
+        
+        if self.whisper_device == 'cuda' and isinstance(audio, np.ndarray):
+            # Copy through pinned memory so the upload is asynchronous, and so the
+            # spectrogram is computed on the GPU instead of on the CPU before each window
+            audio = torch.from_numpy(audio).pin_memory().to('cuda', non_blocking=True)
+        
+        # fp16 is only supported on the GPU; on CPU whisper would warn and fall back per call
+        result = self.whisper_model.transcribe(audio, fp16=self.whisper_device == 'cuda')
+        return result["text"].strip()
+    
+    def submit_transcription(self, audio_data: Union[sr.AudioData, str, np.ndarray]) -> Future:
+        """
+        Queue audio for transcription on the background worker thread
+        
+        Requests from concurrent callers (e.g. web request threads) are run one after
+        another on a single worker, so the model is never entered from several
+        threads at once and callers just wait on their future.
+        
+        Args:
+            audio_data: Audio data (AudioData object, file path, or numpy array)
+            
+        Returns:
+            Future: Resolves to the transcribed text
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='transcriber')
+        return self._executor.submit(self.transcribe_audio, audio_data)
+    
+    def shutdown(self):
+        """Stop the background transcription worker"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def _trim_silence(self, audio: np.ndarray) -> np.ndarray:
+        """
+        Keep only the parts of a clip Silero VAD classifies as speech
+        
+        Args:
+            audio (np.ndarray): 16 kHz float32 samples
+            
+        Returns:
+            np.ndarray: Speech windows (plus padding) concatenated, empty if there is no speech
+        """
+        n_windows = len(audio) // VAD_WINDOW
+        if n_windows == 0:
+            return audio
+        
+        windows = audio[:n_windows * VAD_WINDOW].reshape(n_windows, VAD_WINDOW)
+        self.vad_model.reset_states()
+        with torch.no_grad():
+            probs = np.array([
+                self.vad_model(torch.from_numpy(window), WHISPER_SAMPLE_RATE).item()
+                for window in windows
+            ])
+        
+        # Dilate the speech mask so short pauses and word edges survive
+        speech = np.convolve(probs >= VAD_THRESHOLD, np.ones(2 * VAD_PAD_WINDOWS + 1), mode='same') > 0
+        if not speech.any():
+            return audio[:0]
+        
+        return windows[speech].ravel()
+    
+    def _transcribe_with_whisper(self, audio_data: Union[sr.AudioData, str, np.ndarray, bytes]) -> str:
+        """Transcribe using Whisper (offline)"""
         if not self.whisper_model:
             raise RuntimeError("Whisper model not loaded")
         
@@ -96,29 +369,19 @@ class SpeechRecognizer:
             # Handle different audio data types
             if isinstance(audio_data, str):
                 # File path
-                result = self.whisper_model.transcribe(audio_data)
-                return result["text"].strip()
+                return self._run_whisper(audio_data)
             
             elif isinstance(audio_data, sr.AudioData):
-                # AudioData object - save to temp file
-                with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_file:
-                    temp_path = temp_file.name
-                    
-                # Convert AudioData to WAV file
-                wav_data = audio_data.get_wav_data()
-                with open(temp_path, 'wb') as f:
-                    f.write(wav_data)
-                
-                try:
-                    result = self.whisper_model.transcribe(temp_path)
-                    return result["text"].strip()
-                finally:
-                    os.unlink(temp_path)
+                # AudioData object - pass the PCM straight to Whisper as a float32 array
+                return self._run_whisper(audio_data_to_float32(audio_data))
             
             elif isinstance(audio_data, np.ndarray):
                 # Numpy array
-                result = self.whisper_model.transcribe(audio_data)
-                return result["text"].strip()
+                return self._run_whisper(audio_data)
+            
+            elif isinstance(audio_data, (bytes, bytearray)):
+                # Encoded audio in memory
+                return self._transcribe_bytes_with_whisper(bytes(audio_data))
             
             else:
                 raise ValueError(f"Unsupported audio data type: {type(audio_data)}")
@@ -127,6 +390,22 @@ class SpeechRecognizer:
             logger.error(f"Whisper transcription failed: {e}")
             return ""
     
+    def _transcribe_bytes_with_whisper(self, data: bytes) -> str:
+        """Transcribe an in-memory audio file, decoding PCM WAV without touching disk"""
+        if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+            with sr.AudioFile(io.BytesIO(data)) as source:
+                audio = self.recognizer.record(source)
+            return self._run_whisper(audio_data_to_float32(audio))
+        
+        # Compressed formats are decoded by Whisper's ffmpeg loader, which needs a file
+        with tempfile.NamedTemporaryFile(suffix='.audio', delete=False) as temp_file:
+            temp_file.write(data)
+            temp_path = temp_file.name
+        try:
+            return self._run_whisper(temp_path)
+        finally:
+            os.unlink(temp_path)
+    
     def _transcribe_with_google(self, audio_data: sr.AudioData) -> str:
         """Transcribe using Google Speech Recognition (online)"""
         try:
@@ -193,16 +472,18 @@ class SpeechRecognizer:
     
     def get_available_engines(self) -> list:
         """Get list of available recognition engines"""
-        engines = ['whisper']
+        return list(self._available_engines)
+    
+    @staticmethod
+    def _detect_engines() -> list:
+        """Work out the usable engines from installed libraries and configured keys"""
+        engines = []
         
-        # Check if online services are available
-        try:
-            # Test Google
-            test_audio = sr.AudioData(b'', 16000, 2)
-            self.recognizer.recognize_google(test_audio)
-            engines.append('google')
-        except:
-            pass
+        if WHISPER_AVAILABLE or FASTER_WHISPER_AVAILABLE:
+            engines.append('whisper')
+        
+        # Google's free web API needs no key; it is checked when used instead of probing the network here
+        engines.append('google')
         
         if os.getenv('AZURE_SPEECH_KEY'):
             engines.append('azure')
@@ -5,26 +5,51 @@ Flask-based web application
 
 import os
 import sys
+import shutil
 import tempfile
+import uuid
 import logging
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Flask, Response, render_template, request, jsonify, send_from_directory, stream_with_context
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
-from werkzeug.utils import secure_filename
 import json
 
+# Optional orjson import (faster JSON responses)
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+    orjson = None
+
+# Optional flask-compress import (gzip/brotli response compression)
+try:
+    from flask_compress import Compress
+    COMPRESS_AVAILABLE = True
+except ImportError:
+    COMPRESS_AVAILABLE = False
+    Compress = None
+
 # Add parent directories to path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from speech_to_text.speech_recognizer import SpeechRecognizer
-from ai_analysis.ai_analyzer import AIAnalyzer
+from ai_analysis.ai_analyzer import get_default_analyzer
 from audio_handler.audio_input import AudioInputHandler
-from output_processor.output_formatter import OutputFormatter
+from output_processor.output_formatter import OutputFormatter, to_iso_timestamp
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Seconds a request waits for its queued transcription
+TRANSCRIPTION_TIMEOUT = float(os.getenv('TRANSCRIPTION_TIMEOUT', '120'))
+
+# Chunk size for copying uploads to disk (FileStorage.save copies in 16 KiB reads)
+UPLOAD_COPY_CHUNK = 1 << 20
+
 # Global system components
 speech_recognizer = None
 ai_analyzer = None
@@ -32,6 +57,16 @@ audio_handler = None
 output_formatter = None
 
 
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 def create_app():
     """Create and configure Flask application"""
     # Get the project root directory (two levels up from this file)
@@ -46,11 +81,17 @@ def create_app():
     # Enable CORS
     CORS(app)
     
+    # Faster JSON encoding and compressed responses when the optional packages are installed
+    if ORJSON_AVAILABLE:
+        app.json = ORJSONProvider(app)
+    if COMPRESS_AVAILABLE:
+        Compress(app)
+    
     # Initialize system components
     global speech_recognizer, ai_analyzer, audio_handler, output_formatter
     try:
         speech_recognizer = SpeechRecognizer()
-        ai_analyzer = AIAnalyzer()
+        ai_analyzer = get_default_analyzer()
         audio_handler = AudioInputHandler()
         output_formatter = OutputFormatter(output_style='conversational')
         logger.info("System components initialized successfully")
@@ -73,16 +114,24 @@ def create_app():
             if file.filename == '':
                 return jsonify({'error': 'No file selected'}), 400
             
-            # Save uploaded file temporarily
-            filename = secure_filename(file.filename)
-            temp_dir = tempfile.gettempdir()
-            temp_path = os.path.join(temp_dir, filename)
-            file.save(temp_path)
+            file_ext = os.path.splitext(file.filename)[1].lower()
+            temp_path = None
             
             try:
                 # Process the audio file
                 try:
-                    audio_data = audio_handler.load_audio_file(temp_path)
+                    # WAV (and FLAC/OGG with soundfile) is decoded straight from the upload stream
+                    audio_data = audio_handler.load_audio_stream(file.stream, file_ext)
+                    
+                    if audio_data is None:
+                        # Formats decoded by ffmpeg are saved to a temporary file first, under a
+                        # unique name so concurrent uploads of the same filename can't collide
+                        temp_path = os.path.join(tempfile.gettempdir(), f"{uuid.uuid4().hex}{file_ext}")
+                        file.stream.seek(0)
+                        with open(temp_path, 'wb') as out:
+                            shutil.copyfileobj(file.stream, out, length=UPLOAD_COPY_CHUNK)
+                        audio_data = audio_handler.load_audio_file(temp_path)
+                    
                     if not audio_data:
                         return jsonify({'error': 'Failed to load audio file'}), 400
                 except RuntimeError as e:
@@ -99,11 +148,20 @@ def create_app():
                 except Exception as e:
                     return jsonify({'error': f'Failed to process audio file: {str(e)}'}), 400
                 
-                # Transcribe speech
-                transcribed_text = speech_recognizer.transcribe_audio(audio_data)
+                # Transcribe speech on the recognizer's worker thread
+                transcription = speech_recognizer.submit_transcription(audio_data)
+                try:
+                    transcribed_text = transcription.result(timeout=TRANSCRIPTION_TIMEOUT)
+                except FutureTimeoutError:
+                    # Drop the job if it is still queued; nobody is waiting for it any more
+                    transcription.cancel()
+                    return jsonify({'error': 'Transcription timed out, please try again'}), 504
                 if not transcribed_text.strip():
                     return jsonify({'error': 'No speech detected in audio'}), 400
                 
+                if 'application/x-ndjson' in request.headers.get('Accept', ''):
+                    return stream_audio_response(transcribed_text)
+                
                 # Analyze with AI
                 ai_response = ai_analyzer.analyze_text(transcribed_text)
                 
@@ -116,18 +174,61 @@ def create_app():
                     'ai_response': ai_response.get('response', ''),
                     'analysis': ai_response.get('analysis', {}),
                     'formatted_output': formatted_output,
-                    'timestamp': ai_response.get('timestamp')
+                    'timestamp': to_iso_timestamp(ai_response.get('timestamp'))
                 })
                 
             finally:
                 # Clean up temporary file
-                if os.path.exists(temp_path):
+                if temp_path and os.path.exists(temp_path):
                     os.unlink(temp_path)
                 
         except Exception as e:
             logger.error(f"Audio processing error: {e}")
             return jsonify({'error': f'Processing failed: {str(e)}'}), 500
     
+    def stream_audio_response(transcribed_text: str) -> Response:
+        """
+        Stream process-audio results as NDJSON: the transcript first, then AI response
+        fragments as they are generated, then the final result
+        
+        Args:
+            transcribed_text (str): Transcribed speech
+            
+        Returns:
+            Response: application/x-ndjson response
+        """
+        def line(data):
+            return app.json.dumps(data) + '\n'
+        
+        def generate():
+            yield line({'stage': 'transcribed', 'transcribed_text': transcribed_text})
+            
+            try:
+                stream = ai_analyzer.analyze_text_stream(transcribed_text)
+                while True:
+                    try:
+                        fragment = next(stream)
+                    except StopIteration as done:
+                        ai_response = done.value
+                        break
+                    yield line({'stage': 'token', 'text': fragment})
+                
+                formatted_output = output_formatter.format_response(transcribed_text, ai_response)
+                yield line({
+                    'stage': 'ai',
+                    'success': True,
+                    'transcribed_text': transcribed_text,
+                    'ai_response': ai_response.get('response', ''),
+                    'analysis': ai_response.get('analysis', {}),
+                    'formatted_output': formatted_output,
+                    'timestamp': to_iso_timestamp(ai_response.get('timestamp'))
+                })
+            except Exception as e:
+                logger.error(f"Audio processing error: {e}")
+                yield line({'stage': 'error', 'error': f'Processing failed: {str(e)}'})
+        
+        return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    
     @app.route('/api/analyze-text', methods=['POST'])
     def analyze_text():
         """Analyze text directly (for testing)"""
@@ -140,6 +241,28 @@ def create_app():
             if not text:
                 return jsonify({'error': 'Empty text provided'}), 400
             
+            # Several analysis types at once are answered by a single AI call
+            analysis_types = data.get('analysis_types')
+            if analysis_types:
+                unsupported = [t for t in analysis_types if t not in ('sentiment', 'intent', 'summary')]
+                if unsupported:
+                    return jsonify({'error': f'Unsupported analysis types: {unsupported}'}), 400
+                
+                results = ai_analyzer.multi_analyze(text, analysis_types)
+                return jsonify({
+                    'success': True,
+                    'input_text': text,
+                    'results': {
+                        analysis_type: {
+                            'ai_response': result.get('response', ''),
+                            'analysis': result.get('analysis', {}),
+                            'error': result.get('error')
+                        }
+                        for analysis_type, result in results.items()
+                    },
+                    'timestamp': to_iso_timestamp(next(iter(results.values())).get('timestamp'))
+                })
+            
             analysis_type = data.get('analysis_type', 'general')
             
             # Analyze with AI
@@ -154,7 +277,7 @@ def create_app():
                 'ai_response': ai_response.get('response', ''),
                 'analysis': ai_response.get('analysis', {}),
                 'formatted_output': formatted_output,
-                'timestamp': ai_response.get('timestamp')
+                'timestamp': to_iso_timestamp(ai_response.get('timestamp'))
             })
             
         except Exception as e:
@@ -262,7 +385,7 @@ def create_app():
                 'success': True,
                 'healthy': all_healthy,
                 'components': status,
-                'timestamp': ai_analyzer.analysis_context['session_start'] if ai_analyzer else None
+                'timestamp': to_iso_timestamp(ai_analyzer.analysis_context['session_start']) if ai_analyzer else None
             }), 200 if all_healthy else 503
             
         except Exception as e:
@@ -8,10 +8,16 @@ import sys
 import requests
 import time
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
 
 # Load environment variables
 load_dotenv()
 
+# One keep-alive session for every request, instead of a new connection per call
+SESSION = requests.Session()
+SESSION.mount('http://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+SESSION.headers.update({'Connection': 'keep-alive'})
+
 def test_web_interface():
     """Test the web interface with GROQ"""
     
@@ -19,7 +25,7 @@ def test_web_interface():
     
     try:
         # Test health endpoint
-        response = requests.get('http://localhost:5000/api/health', timeout=5)
+        response = SESSION.get('http://localhost:5000/api/health', timeout=5)
         if response.status_code == 200:
             health_data = response.json()
             print(f"✅ Health check: {health_data.get('healthy', False)}")
@@ -50,7 +56,7 @@ def test_ai_analysis():
             "analysis_type": "general"
         }
         
-        response = requests.post(
+        response = SESSION.post(
             'http://localhost:5000/api/analyze-text',
             json=test_data,
             timeout=15
@@ -84,7 +90,7 @@ def test_different_analysis_types():
     
     for analysis_type in analysis_types:
         try:
-            response = requests.post(
+            response = SESSION.post(
                 'http://localhost:5000/api/analyze-text',
                 json={"text": test_text, "analysis_type": analysis_type},
                 timeout=15
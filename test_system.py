@@ -4,22 +4,76 @@ System Test Script for Speech-to-Text AI System
 Quick verification that all components can be imported and initialized
 """
 
+import argparse
+import hashlib
+import importlib.util
+import io
+import json
 import os
 import sys
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
+# Results of checks whose inputs haven't changed since they last passed
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.system_test_cache.json')
+
+# Add src to path up front, since the checks run concurrently and any of them may import first
+sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
+
+
+class ThreadLocalStdout:
+    """
+    Stdout proxy that sends each worker thread's prints to its own buffer
+
+    contextlib.redirect_stdout swaps sys.stdout for the whole process, so it can't
+    keep concurrently running checks apart. Threads without a buffer write through.
+    """
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._local = threading.local()
+
+    def capture(self):
+        """Start buffering output from the calling thread"""
+        self._local.buffer = io.StringIO()
+
+    def release(self) -> str:
+        """Stop buffering output from the calling thread and return what it printed"""
+        buffer = self._local.__dict__.pop('buffer')
+        return buffer.getvalue()
+
+    def write(self, text):
+        return getattr(self._local, 'buffer', self._stream).write(text)
+
+    def flush(self):
+        getattr(self._local, 'buffer', self._stream).flush()
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def log_exception(e):
+    """
+    Report a caught exception, with the full traceback only when DEBUG is set
+
+    Args:
+        e (Exception): Exception to report
+    """
+    if os.getenv('DEBUG'):
+        traceback.print_exc()
+    else:
+        print(f"   {type(e).__name__}: {e}")
+
 def test_imports():
     """Test that all modules can be imported"""
     print("Testing imports...")
     
     try:
-        # Add src to path
-        sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
-        
         # Test core imports
         from speech_to_text.speech_recognizer import SpeechRecognizer
         print("✓ SpeechRecognizer imported successfully")
@@ -40,7 +94,7 @@ def test_imports():
         
     except Exception as e:
         print(f"✗ Import failed: {e}")
-        traceback.print_exc()
+        log_exception(e)
         return False
 
 def test_component_initialization():
@@ -82,7 +136,7 @@ def test_component_initialization():
         
     except Exception as e:
         print(f"✗ Component initialization failed: {e}")
-        traceback.print_exc()
+        log_exception(e)
         return False
 
 def test_basic_functionality():
@@ -131,7 +185,7 @@ def test_basic_functionality():
         
     except Exception as e:
         print(f"✗ Basic functionality test failed: {e}")
-        traceback.print_exc()
+        log_exception(e)
         return False
 
 def test_web_interface():
@@ -160,7 +214,25 @@ def test_web_interface():
             
     except Exception as e:
         print(f"✗ Web interface test failed: {e}")
-        traceback.print_exc()
+        log_exception(e)
+        return False
+
+def dependency_available(name):
+    """
+    Check whether a module can be imported without importing it
+
+    Args:
+        name (str): Top-level module name
+
+    Returns:
+        bool: True if the module is already loaded or can be found on the path
+    """
+    if name in sys.modules:
+        return True
+    try:
+        # find_spec stops at the loader lookup, so torch/whisper aren't executed just to check
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
         return False
 
 def check_dependencies():
@@ -185,18 +257,16 @@ def check_dependencies():
     all_good = True
     
     for dep in dependencies:
-        try:
-            __import__(dep.replace('-', '_'))
+        if dependency_available(dep.replace('-', '_')):
             print(f"✓ {dep}")
-        except ImportError:
+        else:
             print(f"✗ {dep} (required)")
             all_good = False
     
     for dep in optional_dependencies:
-        try:
-            __import__(dep.replace('-', '_'))
+        if dependency_available(dep.replace('-', '_')):
             print(f"✓ {dep} (optional)")
-        except ImportError:
+        else:
             print(f"⚠ {dep} (optional, not installed)")
     
     return all_good
@@ -220,11 +290,90 @@ def check_environment():
     
     return True
 
-def main():
+def cache_fingerprint():
+    """
+    Fingerprint the inputs of the cacheable checks (installed packages and environment)
+
+    Installing or removing a package changes the mtime of its sys.path directory, and the
+    .env file and API key configuration cover check_environment. The key itself isn't stored.
+
+    Returns:
+        str: Hex digest that changes whenever a cached result could be stale
+    """
+    api_key = os.getenv('OPENAI_API_KEY')
+    parts = [sys.executable, sys.version, str(bool(api_key and api_key != 'your_openai_api_key_here'))]
+    # The project's own directories are skipped, since writing the cache file touches them
+    project_dir = os.path.dirname(CACHE_FILE)
+    package_dirs = [p for p in sys.path if p and not os.path.abspath(p).startswith(project_dir)]
+    for path in package_dirs + ['requirements.txt', '.env']:
+        try:
+            parts.append(f"{path}:{os.stat(path).st_mtime_ns}")
+        except OSError:
+            parts.append(f"{path}:-")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+def load_cache(fingerprint):
+    """Return cached passing results as {test_name: output}, or {} if stale or missing"""
+    try:
+        with open(CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get('passed', {}) if cache.get('fingerprint') == fingerprint else {}
+
+def save_cache(fingerprint, passed):
+    """Record the outputs of passing cacheable checks"""
+    try:
+        with open(CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'passed': passed}, f, indent=2)
+    except OSError as e:
+        print(f"⚠ Could not write {CACHE_FILE}: {e}")
+
+def parse_shard(value):
+    """
+    Parse a --shard argument of the form i/N
+
+    Args:
+        value (str): Zero-based shard index and shard count, e.g. "0/4"
+
+    Returns:
+        tuple: (index, count)
+    """
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be in 0..N-1, got {value!r}")
+    return index, count
+
+def load_results(paths):
+    """Combine the (test_name, result) lists written by each shard's --results file"""
+    results = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            results.extend((test_name, bool(result)) for test_name, result in json.load(f))
+    return results
+
+def main(argv=None):
     """Run all tests"""
+    parser = argparse.ArgumentParser(description="Speech-to-Text AI System - System Test")
+    parser.add_argument('--force', action='store_true',
+                        help="Re-run every check, ignoring results cached from the last run")
+    parser.add_argument('--shard', type=parse_shard, default=(0, 1), metavar='i/N',
+                        help="Only run every N-th check starting at index i, so N processes can split the run")
+    parser.add_argument('--results', metavar='PATH',
+                        help="Also write this run's (check, passed) pairs to a JSON file")
+    parser.add_argument('--merge', nargs='+', metavar='PATH',
+                        help="Summarize --results files from several shards instead of running checks")
+    args = parser.parse_args(argv)
+    
     print("Speech-to-Text AI System - System Test")
     print("=" * 50)
     
+    if args.merge:
+        return print_summary(load_results(args.merge))
+    
     tests = [
         ("Dependencies", check_dependencies),
         ("Environment", check_environment),
@@ -234,19 +383,77 @@ def main():
         ("Web Interface", test_web_interface)
     ]
     
-    results = []
+    # Deterministic round-robin split, so shards stay balanced as checks are added
+    shard_index, shard_count = args.shard
+    tests = [test for idx, test in enumerate(tests) if idx % shard_count == shard_index]
     
-    for test_name, test_func in tests:
-        print(f"\n{test_name}:")
-        print("-" * 30)
+    # Checks that only depend on installed packages and configuration, so a pass can be reused
+    cacheable = {"Dependencies", "Environment"}
+    fingerprint = cache_fingerprint()
+    cached = {} if args.force else load_cache(fingerprint)
+    
+    results = []
+    outputs = {}
+    stdout = ThreadLocalStdout(sys.stdout)
+
+    def run_check(test_name, test_func):
+        """Run one check with its output buffered, returning (result, output)"""
+        stdout.capture()
         try:
             result = test_func()
-            results.append((test_name, result))
         except Exception as e:
             print(f"✗ {test_name} failed with exception: {e}")
-            results.append((test_name, False))
+            result = False
+        return result, stdout.release()
+
+    # The checks are independent and mostly wait on imports, so give each one its own
+    # thread (not a CPU-count pool) and print each one's buffered output in the original order
+    sys.stdout = stdout
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, len(tests))) as executor:
+            futures = [(test_name, None if test_name in cached else executor.submit(run_check, test_name, test_func))
+                       for test_name, test_func in tests]
+            for test_name, future in futures:
+                if future is None:
+                    result, output = True, cached[test_name]
+                else:
+                    result, output = future.result()
+                print(f"\n{test_name}:")
+                print("-" * 30)
+                print(output, end='')
+                outputs[test_name] = output
+                if future is None:
+                    print("(cached result, nothing changed since it passed; use --force to re-run)")
+                results.append((test_name, result))
+    finally:
+        sys.stdout = stdout._stream
+    
+    # Keep entries for checks other shards ran; replace the ones this run covered
+    passed = {test_name: output for test_name, output in load_cache(fingerprint).items()
+              if test_name not in outputs}
+    passed.update({
+        test_name: outputs[test_name]
+        for test_name, result in results
+        if result and test_name in cacheable
+    })
+    save_cache(fingerprint, passed)
+    
+    if args.results:
+        with open(args.results, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
     
-    # Summary
+    return print_summary(results)
+
+def print_summary(results):
+    """
+    Print the pass/fail summary
+
+    Args:
+        results (list): (test_name, passed) pairs
+
+    Returns:
+        int: Process exit code (0 if every check passed)
+    """
     print("\n" + "=" * 50)
     print("TEST SUMMARY")
     print("=" * 50)
@@ -0,0 +1,172 @@
+"""
+Shared pytest fixtures for the Speech-to-Text AI System tests
+"""
+
+import os
+import sys
+import time
+import wave
+from functools import lru_cache
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+# Put src on the path once for every test module (and every xdist worker)
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src'))
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from ai_analysis.ai_analyzer import AIAnalyzer
+from audio_handler.audio_input import AudioInputHandler
+from output_processor.output_formatter import OutputFormatter
+import web_interface.app as web_app
+
+
+@lru_cache(maxsize=None)
+def tone_pcm16(duration: float = 1.0, sample_rate: int = 16000, frequency: float = 440.0) -> np.ndarray:
+    """
+    Generate a sine tone as 16-bit PCM, cached so repeated requests skip the math
+
+    Args:
+        duration (float): Length in seconds
+        sample_rate (int): Samples per second
+        frequency (float): Tone frequency in Hz
+
+    Returns:
+        np.ndarray: Little-endian int16 samples (read-only, since the cached array is shared)
+    """
+    n = int(sample_rate * duration)
+    omega = np.float32(2 * np.pi * frequency / sample_rate)
+
+    # Work in one float32 buffer, scaling and rounding in place
+    samples = np.arange(n, dtype=np.float32)
+    np.multiply(samples, omega, out=samples)
+    np.sin(samples, out=samples)
+    np.multiply(samples, 32767.0, out=samples)
+    np.rint(samples, out=samples)
+    pcm = samples.astype('<i2')
+    pcm.flags.writeable = False
+    return pcm
+
+
+def fake_completion(text, finish_reason='stop'):
+    """
+    Build a chat completion (or single stream chunk) with one choice
+
+    Plain namespaces rather than Mock objects, which create child mocks and record calls.
+    The message doubles as the stream delta, so streaming and non-streaming callers both work.
+    """
+    message = SimpleNamespace(content=text)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, delta=message, finish_reason=finish_reason)])
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    """Set a test OpenAI API key for every test; monkeypatch restores the environment afterwards"""
+    monkeypatch.setenv('OPENAI_API_KEY', 'test-api-key')
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _preload():
+    """Import the heavy modules (speech_recognition, openai, flask, ...) once per worker"""
+    import speech_to_text.speech_recognizer  # noqa: F401
+    import ai_analysis.ai_analyzer  # noqa: F401
+    import audio_handler.audio_input  # noqa: F401
+    import output_processor.output_formatter  # noqa: F401
+    import web_interface.app  # noqa: F401
+
+
+@pytest.fixture(scope="session")
+def test_audio_file(tmp_path_factory):
+    """Write a one second 440 Hz test tone once per session and yield its path"""
+    sample_rate = 16000
+    samples = tone_pcm16(1.0, sample_rate)
+    path = tmp_path_factory.mktemp("audio") / "tone.wav"
+    with wave.open(str(path), 'wb') as wav_file:
+        # Mono, 16-bit, with the frame count known up front so the header isn't rewritten
+        wav_file.setparams((1, 2, sample_rate, len(samples), 'NONE', 'not compressed'))
+        # writeframes takes any buffer, so the samples go out without a tobytes() copy
+        wav_file.writeframes(samples.data)
+
+    yield str(path)
+
+    path.unlink(missing_ok=True)
+
+
+@pytest.fixture(scope="module")
+def ai_analyzer():
+    """AI analyzer shared by every test in a module"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('OPENAI_API_KEY', 'test-api-key')
+        return AIAnalyzer()
+
+
+@pytest.fixture(scope="module")
+def audio_handler():
+    """Audio input handler shared by every test in a module"""
+    return AudioInputHandler()
+
+
+@pytest.fixture
+def output_formatter():
+    """Fresh output formatter per test, since it records session outputs"""
+    formatter = OutputFormatter()
+    yield formatter
+    formatter.clear_session()
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    """
+    Answer every OpenAI chat completion with fake_openai.text
+
+    Patches the client's Completions and AsyncCompletions classes, so analyzers
+    created before the test (like the module-scoped ai_analyzer) are covered too.
+    Setting fake_openai.error makes every call raise it instead.
+    """
+    def _create(self, *, stream=False, **kwargs):
+        _create.calls.append(kwargs)
+        if _create.error is not None:
+            raise _create.error
+        response = fake_completion(_create.text)
+        return iter([response]) if stream else response
+
+    async def _acreate(self, *, stream=False, **kwargs):
+        response = _create(self, **kwargs)
+
+        async def chunks():
+            yield response
+
+        return chunks() if stream else response
+
+    _create.text = "This is a test response from AI."
+    _create.error = None
+    _create.calls = []
+    monkeypatch.setattr('openai.resources.chat.completions.Completions.create', _create)
+    monkeypatch.setattr('openai.resources.chat.completions.AsyncCompletions.create', _acreate)
+    return _create
+
+
+@pytest.fixture(scope="session")
+def flask_client():
+    """
+    Test client for one Flask app built per session, with the system components mocked out
+
+    The mocks and the module-level component globals are restored when the session ends.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('OPENAI_API_KEY', 'test-api-key')
+        mp.setattr(web_app, 'SpeechRecognizer', MagicMock())
+        mp.setattr(web_app, 'get_default_analyzer',
+                   lambda: SimpleNamespace(analysis_context={'session_start': time.time()}))
+        mp.setattr(web_app, 'AudioInputHandler', MagicMock())
+        mp.setattr(web_app, 'OutputFormatter', MagicMock())
+        for name in ('speech_recognizer', 'ai_analyzer', 'audio_handler', 'output_formatter'):
+            mp.setattr(web_app, name, getattr(web_app, name))
+
+        app = web_app.create_app()
+        app.config['TESTING'] = True
+        with app.test_client() as client:
+            yield client
@@ -0,0 +1,357 @@
+"""
+Integration tests for AI analysis and the text-to-response pipeline
+"""
+
+import asyncio
+import gc
+import json
+import re
+import sys
+import weakref
+
+import pytest
+
+from ai_analysis.ai_analyzer import AIAnalyzer
+
+
+@pytest.fixture
+def analyzer():
+    """Fresh analyzer, so no response cached by another test is served"""
+    analyzer = AIAnalyzer()
+    yield analyzer
+    analyzer.close()
+
+
+def drain_stream(stream):
+    """Collect the fragments yielded by analyze_text_stream and the result it returns"""
+    fragments = []
+    while True:
+        try:
+            fragments.append(next(stream))
+        except StopIteration as done:
+            return fragments, done.value
+
+
+class TestAIAnalysis:
+    """Tests for AI analysis, configuration and the analysis/formatting pipeline"""
+    
+    def test_ai_analyzer_text_processing(self, fake_openai, ai_analyzer):
+        """Test AI analyzer text processing"""
+        fake_openai.text = "This is a test response from AI."
+        
+        # Test general analysis
+        result = ai_analyzer.analyze_text("Hello, how are you?")
+        
+        assert 'response' in result
+        assert 'analysis' in result
+        assert result['response'] == "This is a test response from AI."
+        
+        # Test empty text
+        result = ai_analyzer.analyze_text("")
+        assert 'error' in result
+    
+    def test_complete_pipeline_simulation(self, fake_openai, ai_analyzer, output_formatter):
+        """Test the complete pipeline with mocked components"""
+        fake_openai.text = "I understand you said 'Hello world'. How can I help you today?"
+        
+        # Simulate the pipeline
+        transcribed_text = "Hello world"
+        
+        # Step 1: AI Analysis
+        ai_result = ai_analyzer.analyze_text(transcribed_text)
+        
+        # Step 2: Format output
+        formatted_result = output_formatter.format_response(transcribed_text, ai_result)
+        
+        # Verify results
+        assert formatted_result is not None
+        assert 'Hello world' in formatted_result
+        assert 'AI Response:' in formatted_result
+    
+    @pytest.mark.parametrize("env,expected", [
+        ({'AI_MODEL': 'gpt-4', 'MAX_TOKENS': '1000', 'TEMPERATURE': '0.5'}, ('gpt-4', 1000, 0.5)),
+        ({'AI_MODEL': 'gpt-4o-mini'}, ('gpt-4o-mini', 500, 0.7)),
+        ({}, ('gpt-3.5-turbo', 500, 0.7)),
+    ])
+    def test_configuration_loading(self, monkeypatch, env, expected):
+        """Test configuration loading from environment"""
+        monkeypatch.delenv('AI_PROVIDER', raising=False)
+        for name in ('AI_MODEL', 'MAX_TOKENS', 'TEMPERATURE'):
+            if name in env:
+                monkeypatch.setenv(name, env[name])
+            else:
+                monkeypatch.delenv(name, raising=False)
+        
+        analyzer = AIAnalyzer()
+        
+        assert (analyzer.model, analyzer.max_tokens, analyzer.temperature) == expected
+    
+    def test_recent_topics(self, fake_openai):
+        """Test recent topics are the last ten mentions, deduplicated in order of mention"""
+        analyzer = AIAnalyzer()
+        for text in ("weather food work family health technology", "sports music weather", "food travel"):
+            analyzer.analyze_text(text)
+        
+        summary = analyzer.get_conversation_summary()
+        
+        assert summary['recent_topics'] == [
+            'food', 'work', 'family', 'health', 'technology', 'sports', 'music', 'weather', 'travel'
+        ]
+        assert sorted(summary['session_info']['topics_discussed']) == sorted(summary['recent_topics'])
+        
+        analyzer.clear_history()
+        assert analyzer.get_conversation_summary()['recent_topics'] == []
+    
+    def test_analyzer_released_when_unused(self):
+        """Test nothing global keeps a discarded analyzer (and its history log) alive"""
+        analyzer = weakref.ref(AIAnalyzer())
+        gc.collect()
+        
+        assert analyzer() is None
+
+
+
+class TestTrivialResponses:
+    """Tests for input answered locally without calling the AI service"""
+    
+    def test_whitelisted_phrase_answered_locally(self, fake_openai, ai_analyzer):
+        """Test a whitelisted acknowledgement gets its canned reply"""
+        result = ai_analyzer.analyze_text("Thanks!")
+        
+        assert result['response'] == "You're welcome!"
+        assert result['analysis']['trivial'] is True
+        assert fake_openai.calls == []
+    
+    def test_time_question_answered_locally(self, fake_openai, ai_analyzer):
+        """Test the time question is answered from the local clock"""
+        result = ai_analyzer.analyze_text("What time is it?")
+        
+        assert re.fullmatch(r"It's \d{2}:\d{2}\.", result['response'])
+        assert fake_openai.calls == []
+    
+    @pytest.mark.parametrize("text", ["Weather?", "Paris", "Why?"])
+    def test_single_word_question_reaches_model(self, fake_openai, ai_analyzer, text):
+        """Test one-word queries are sent to the AI service, not given a canned reply"""
+        fake_openai.text = f"Answer about {text}"
+        
+        result = ai_analyzer.analyze_text(text)
+        
+        assert result['response'] == f"Answer about {text}"
+        assert len(fake_openai.calls) == 1
+    
+    def test_punctuation_only_not_sent(self, fake_openai, ai_analyzer):
+        """Test input with no words is short-circuited"""
+        result = ai_analyzer.analyze_text("?!")
+        
+        assert 'trivial' in result['analysis']
+        assert fake_openai.calls == []
+    
+    @pytest.mark.parametrize("text,expected", [
+        ("  Hello.  ", "Hi there!"),
+        ("THANK YOU!", "You're welcome!"),
+        ("...", "Could you elaborate?"),
+        ("hello world", None),
+        ("Is it yes or no?", None),
+    ])
+    def test_trivial_response_rules(self, ai_analyzer, text, expected):
+        """Test whitelist matching ignores case, spacing and trailing punctuation"""
+        assert ai_analyzer._trivial_response(text) == expected
+    
+    def test_other_analysis_types_not_short_circuited(self, fake_openai, analyzer, monkeypatch):
+        """Test canned replies only apply to general analysis"""
+        monkeypatch.setattr(analyzer, '_embed', lambda text: None)  # No semantic cache lookup
+        fake_openai.text = "Grateful"
+        
+        result = analyzer.analyze_text("Thanks!", 'sentiment')
+        
+        assert result['response'] == "Grateful"
+        assert len(fake_openai.calls) == 1
+
+
+
+class TestStreaming:
+    """Tests for streaming analysis with analyze_text_stream"""
+    
+    def test_stream_yields_fragments_then_result(self, fake_openai, analyzer):
+        """Test fragments are yielded as they arrive and the full result is returned"""
+        fake_openai.text = "Streamed answer"
+        
+        fragments, result = drain_stream(analyzer.analyze_text_stream("Tell me about music"))
+        
+        assert fragments == ["Streamed answer"]
+        assert result['response'] == "Streamed answer"
+        assert result['analysis']['topics'] == ['music']
+        assert fake_openai.calls[0]['model'] == analyzer.model
+    
+    def test_stream_error_returns_fallback(self, fake_openai, analyzer):
+        """Test a failed AI call yields nothing and returns the error response"""
+        fake_openai.error = RuntimeError("service down")
+        
+        fragments, result = drain_stream(analyzer.analyze_text_stream("Tell me about music"))
+        
+        assert fragments == []
+        assert result['error'] == "service down"
+        assert result['response'] == AIAnalyzer.ERROR_RESPONSES['general']
+    
+    def test_stream_trivial_input_not_sent(self, fake_openai, analyzer):
+        """Test input answered locally returns without streaming from the AI service"""
+        fragments, result = drain_stream(analyzer.analyze_text_stream("Thanks!"))
+        
+        assert fragments == []
+        assert result['response'] == "You're welcome!"
+        assert fake_openai.calls == []
+
+
+
+class TestAsyncAnalysis:
+    """Tests for analyze_text_async"""
+    
+    def test_async_streams_tokens_to_callback(self, fake_openai, analyzer):
+        """Test on_token receives each fragment and the full result is returned"""
+        fake_openai.text = "Async answer"
+        tokens = []
+        
+        result = asyncio.run(analyzer.analyze_text_async("Plan my travel", on_token=tokens.append))
+        
+        assert tokens == ["Async answer"]
+        assert result['response'] == "Async answer"
+        assert len(fake_openai.calls) == 1
+    
+    def test_async_without_callback(self, fake_openai, analyzer):
+        """Test the non-streaming async call returns the response"""
+        fake_openai.text = "Async answer"
+        
+        result = asyncio.run(analyzer.analyze_text_async("Plan my travel"))
+        
+        assert result['response'] == "Async answer"
+    
+    def test_async_error_returns_fallback(self, fake_openai, analyzer):
+        """Test a failed AI call returns the error response without calling on_token"""
+        fake_openai.error = RuntimeError("service down")
+        tokens = []
+        
+        result = asyncio.run(analyzer.analyze_text_async("Plan my travel", on_token=tokens.append))
+        
+        assert tokens == []
+        assert result['error'] == "service down"
+        assert result['response'] == AIAnalyzer.ERROR_RESPONSES['general']
+
+
+
+class TestMultiAnalyze:
+    """Tests for answering several analysis types with one AI call"""
+    
+    def test_one_call_answers_every_type(self, fake_openai, analyzer):
+        """Test one JSON-mode request produces a result per type"""
+        fake_openai.text = json.dumps({
+            'sentiment': 'positive',
+            'intent': 'question',
+            'summary': {'points': ['greeting']}
+        })
+        
+        results = analyzer.multi_analyze("Hello there, how are you?")
+        
+        assert len(fake_openai.calls) == 1
+        assert fake_openai.calls[0]['response_format'] == {"type": "json_object"}
+        assert list(results) == ['sentiment', 'intent', 'summary']
+        assert results['sentiment']['response'] == 'positive'
+        assert results['intent']['analysis']['type'] == 'intent'
+        # Non-string values are passed on as JSON text
+        assert json.loads(results['summary']['response']) == {'points': ['greeting']}
+        assert len({result['timestamp'] for result in results.values()}) == 1
+    
+    def test_unsupported_types_dropped(self, fake_openai, analyzer):
+        """Test only supported analysis types are requested"""
+        fake_openai.text = json.dumps({'sentiment': 'neutral'})
+        
+        results = analyzer.multi_analyze("Hello there", ['sentiment', 'general'])
+        
+        assert list(results) == ['sentiment']
+        assert 'general' not in fake_openai.calls[0]['messages'][0]['content']
+    
+    def test_invalid_json_returns_fallbacks(self, fake_openai, analyzer):
+        """Test a reply that isn't JSON gives every type its error response"""
+        fake_openai.text = "not json"
+        
+        results = analyzer.multi_analyze("Hello there", ['sentiment', 'intent'])
+        
+        for analysis_type, result in results.items():
+            assert 'error' in result
+            assert result['response'] == AIAnalyzer.ERROR_RESPONSES[analysis_type]
+    
+    def test_empty_text_not_sent(self, fake_openai, analyzer):
+        """Test empty text returns the empty-text result for every type"""
+        results = analyzer.multi_analyze("  ")
+        
+        assert all(result['error'] == 'Empty text provided' for result in results.values())
+        assert fake_openai.calls == []
+
+
+
+class TestMicroBatching:
+    """Tests for batching async general analyses queued within AI_BATCH_WINDOW_MS"""
+    
+    TEXTS = ("Plan my travel", "Suggest some music", "Recommend a movie")
+    
+    @pytest.fixture
+    def batching_analyzer(self, analyzer):
+        """Analyzer that batches general analyses queued within 10 ms"""
+        analyzer.batch_window = 0.01
+        return analyzer
+    
+    @staticmethod
+    def analyze_together(analyzer, texts, on_token=None):
+        """Start an async general analysis per text at once and return the results in order"""
+        async def run():
+            return await asyncio.gather(*(analyzer.analyze_text_async(t, on_token=on_token) for t in texts))
+        return asyncio.run(run())
+    
+    def test_batch_sent_as_one_call(self, fake_openai, batching_analyzer):
+        """Test queued utterances share one JSON-mode call and get their own answers, in order"""
+        fake_openai.text = json.dumps({'1': 'Pack light', '2': ['Jazz'], '3': 'Watch a comedy'})
+        tokens = []
+        
+        results = self.analyze_together(batching_analyzer, self.TEXTS, on_token=tokens.append)
+        
+        assert len(fake_openai.calls) == 1
+        assert fake_openai.calls[0]['response_format'] == {"type": "json_object"}
+        assert "1. Plan my travel\n2. Suggest some music\n3. Recommend a movie" in \
+            fake_openai.calls[0]['messages'][-1]['content']
+        assert [result['response'] for result in results] == ['Pack light', '["Jazz"]', 'Watch a comedy']
+        assert sorted(tokens) == sorted(result['response'] for result in results)
+        assert [turn['user_text'] for turn in batching_analyzer.conversation_history] == list(self.TEXTS)
+    
+    def test_single_request_sent_unbatched(self, fake_openai, batching_analyzer):
+        """Test a lone utterance in the window is sent as a normal request"""
+        fake_openai.text = "Pack light"
+        
+        [result] = self.analyze_together(batching_analyzer, self.TEXTS[:1])
+        
+        assert result['response'] == "Pack light"
+        assert 'response_format' not in fake_openai.calls[0]
+    
+    @pytest.mark.parametrize("texts", [TEXTS[:1], TEXTS])
+    def test_batch_error_returns_fallbacks(self, fake_openai, batching_analyzer, texts):
+        """Test a failed call resolves every queued analysis with the error response"""
+        fake_openai.error = RuntimeError("service down")
+        
+        results = self.analyze_together(batching_analyzer, texts)
+        
+        assert len(results) == len(texts)
+        for result in results:
+            assert result['error'] == "service down"
+            assert result['response'] == AIAnalyzer.ERROR_RESPONSES['general']
+        assert batching_analyzer._pending == []
+    
+    def test_batch_invalid_json_returns_fallbacks(self, fake_openai, batching_analyzer):
+        """Test a batched reply that isn't JSON resolves every analysis with the error response"""
+        fake_openai.text = "not json"
+        
+        results = self.analyze_together(batching_analyzer, self.TEXTS)
+        
+        assert all(result['response'] == AIAnalyzer.ERROR_RESPONSES['general'] for result in results)
+
+
+if __name__ == '__main__':
+    # Run the tests (fixtures and parallel workers need pytest)
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,171 @@
+"""
+Integration tests for audio input handling
+"""
+
+import sys
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+
+import audio_handler.audio_input as audio_input
+from audio_handler.audio_input import AudioInputHandler
+
+# Taken before _stub_sr replaces it, for tests that decode through speech_recognition
+Recognizer = sr.Recognizer
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _stub_sr():
+    """
+    Replace speech_recognition.Recognizer once for this module
+
+    The audio handler only needs a recognizer for microphone capture, which these tests
+    never start. Autouse runs this before the module-scoped audio_handler is built, and
+    the original class is restored when the module finishes.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr('speech_recognition.Recognizer', lambda *args, **kwargs: SimpleNamespace())
+        yield
+
+
+class TestAudioInput:
+    """Tests for audio handler setup and audio file loading"""
+    
+    def test_audio_handler_initialization(self, audio_handler):
+        """Test audio handler initialization"""
+        assert audio_handler.sample_rate is not None
+        assert audio_handler.chunk_size is not None
+    
+    @pytest.mark.parametrize("name,content", [
+        ("non_existent_file.wav", None),
+        ("empty.wav", b""),
+        ("truncated.wav", b"RIFF\x24\x00\x00\x00WAVE"),
+    ])
+    def test_audio_file_loading_failures(self, tmp_path, audio_handler, name, content):
+        """Test a missing, empty or corrupt file loads as None instead of raising"""
+        path = tmp_path / name
+        if content is not None:
+            path.write_bytes(content)
+        
+        assert audio_handler.load_audio_file(str(path)) is None
+    
+    def test_wav_file_decoding(self, test_audio_file, audio_handler):
+        """Test a WAV file is decoded to 16 kHz 16-bit audio"""
+        audio_data = audio_handler.load_audio_file(test_audio_file)
+        
+        assert audio_data.sample_rate == 16000
+        assert audio_data.sample_width == 2
+        assert len(audio_data.get_raw_data()) == 16000 * 2
+    
+    @staticmethod
+    def record_loaded_audio(handler, monkeypatch):
+        """Make handler.load_audio_file keep each AudioData it returns in the returned list"""
+        loaded = []
+        load_audio_file = handler.load_audio_file
+        
+        def recording_load(path):
+            loaded.append(load_audio_file(path))
+            return loaded[-1]
+        
+        monkeypatch.setattr(handler, 'load_audio_file', recording_load)
+        return loaded
+    
+    def test_numpy_loading_views_16bit_buffer(self, test_audio_file, audio_handler, monkeypatch):
+        """Test 16-bit audio loads as a read-only int16 view of the AudioData buffer"""
+        loaded = self.record_loaded_audio(audio_handler, monkeypatch)
+        
+        samples, sample_rate = audio_handler.load_audio_file_np(test_audio_file)
+        
+        assert (samples.dtype, sample_rate, len(samples)) == (np.dtype('<i2'), 16000, 16000)
+        assert not samples.flags.writeable
+        assert np.shares_memory(samples, np.frombuffer(loaded[0].frame_data, dtype=np.uint8))
+    
+    def test_numpy_loading_converts_8bit(self, tmp_path, audio_handler, monkeypatch):
+        """Test 8-bit audio is converted to a 16-bit copy"""
+        monkeypatch.setattr(audio_handler, 'recognizer', Recognizer())
+        loaded = self.record_loaded_audio(audio_handler, monkeypatch)
+        path = tmp_path / "8bit.wav"
+        with wave.open(str(path), 'wb') as wav_file:
+            wav_file.setparams((1, 1, 8000, 4, 'NONE', 'not compressed'))
+            wav_file.writeframes(bytes([128, 192, 64, 0]))  # Unsigned: 0, +0.5, -0.5, -1
+        
+        samples, sample_rate = audio_handler.load_audio_file_np(str(path))
+        
+        assert (samples.dtype, sample_rate) == (np.dtype('<i2'), 8000)
+        assert samples.tolist() == [0, 16384, -16384, -32768]
+        assert not samples.flags.writeable
+        assert not np.shares_memory(samples, np.frombuffer(loaded[0].frame_data, dtype=np.uint8))
+    
+    def test_numpy_loading_missing_file(self, tmp_path, audio_handler):
+        """Test a missing file loads as None"""
+        assert audio_handler.load_audio_file_np(str(tmp_path / "missing.wav")) is None
+
+
+class FakeVADCapture:
+    """Records the device VAD capture was opened on"""
+    
+    opened = []
+    
+    def __init__(self, sample_rate, device=None, energy_threshold=300):
+        FakeVADCapture.opened.append(device)
+        self.vad = object()  # Skip energy calibration
+    
+    def capture(self, **kwargs):
+        return 'captured audio'
+    
+    def stop(self):
+        pass
+
+
+class TestMicrophoneSelection:
+    """Tests that a microphone chosen in setup_microphone is the one captured from"""
+    
+    @pytest.fixture
+    def handler(self, monkeypatch):
+        """Handler in VAD capture mode whose PyAudio index 3 is named 'USB Mic'"""
+        def no_microphone(**kwargs):
+            raise OSError("no audio hardware in tests")
+        
+        monkeypatch.setattr('speech_recognition.Microphone', no_microphone)
+        monkeypatch.setattr(audio_input, 'VADCapture', FakeVADCapture)
+        FakeVADCapture.opened = []
+        
+        handler = AudioInputHandler()
+        handler.use_vad_capture = True
+        handler.audio = SimpleNamespace(get_device_info_by_index=lambda i: {'name': 'USB Mic'},
+                                        terminate=lambda: None)
+        handler.recognizer = SimpleNamespace(energy_threshold=300, pause_threshold=0.8)
+        return handler
+    
+    def test_vad_capture_opens_selected_device(self, handler, monkeypatch):
+        """Test the chosen device is mapped by name and passed to VADCapture"""
+        monkeypatch.setattr(audio_input, 'find_input_device', lambda name: 7 if name == 'USB Mic' else None)
+        
+        handler.setup_microphone(3)
+        
+        assert handler.capture_live_audio(timeout=1, phrase_timeout=1) == 'captured audio'
+        assert FakeVADCapture.opened == [7]
+    
+    def test_unmapped_device_falls_back_to_listen(self, handler, monkeypatch):
+        """Test VAD capture is turned off rather than recording from the default input"""
+        monkeypatch.setattr(audio_input, 'find_input_device', lambda name: None)
+        
+        handler.setup_microphone(3)
+        
+        assert handler.use_vad_capture is False
+        assert FakeVADCapture.opened == []
+    
+    def test_default_device(self, handler):
+        """Test no explicit device keeps the system default input"""
+        handler.setup_microphone()
+        
+        handler.capture_live_audio(timeout=1, phrase_timeout=1)
+        assert FakeVADCapture.opened == [None]
+
+
+if __name__ == '__main__':
+    # Run the tests (fixtures and parallel workers need pytest)
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,118 @@
+"""
+Integration tests for output formatting and session management
+"""
+
+import json
+import sys
+from datetime import datetime
+from types import MappingProxyType
+
+import pytest
+
+import output_processor.output_formatter as output_formatter_module
+from output_processor.output_formatter import to_iso_timestamp
+
+
+# AI analysis result shared by every test; read-only so no test can change it for the others
+# (format_response only reads it, and the inner dict stays a dict so JSON output can encode it)
+TEST_ANALYSIS = MappingProxyType({
+    'response': 'Test response',
+    'analysis': {'word_count': 3, 'topics': ('test',)},
+    'timestamp': '2023-01-01T12:00:00'
+})
+
+
+class TestOutputFormatter:
+    """Tests for output styles, session summaries and error messages"""
+    
+    def test_output_formatter_initialization(self, output_formatter):
+        """Test output formatter initialization"""
+        assert output_formatter.output_style == 'conversational'
+        assert len(output_formatter.session_outputs) == 0
+    
+    @pytest.mark.parametrize("style,markers", [
+        ('conversational', ('You said:', 'AI Response:')),
+        ('minimal', ('You:', 'AI:')),
+    ])
+    def test_output_formatter_styles(self, output_formatter, style, markers):
+        """Test different output formatting styles"""
+        output_formatter.set_output_style(style)
+        result = output_formatter.format_response("Hello world", TEST_ANALYSIS)
+        for marker in markers:
+            assert marker in result
+    
+    def test_output_formatter_json_style(self, output_formatter):
+        """Test JSON output formatting style"""
+        output_formatter.set_output_style('json')
+        result = output_formatter.format_response("Hello world", TEST_ANALYSIS)
+        assert result.startswith('{')
+        assert result.endswith('}')
+    
+    def test_session_management(self, output_formatter):
+        """Test session management functionality"""
+        formatter = output_formatter
+        
+        # Test empty session
+        summary = formatter.get_session_summary()
+        assert 'No interactions' in summary
+        
+        # Add some test interactions
+        formatter.format_response("Test input", TEST_ANALYSIS)
+        
+        # Test session with interactions
+        summary = formatter.get_session_summary()
+        assert 'Total interactions: 1' in summary
+        
+        # Test session clearing
+        formatter.clear_session()
+        assert len(formatter.session_outputs) == 0
+    
+    def test_error_handling(self, output_formatter):
+        """Test error handling throughout the system"""
+        formatter = output_formatter
+        
+        # Test error formatting
+        error_msg = formatter.format_error("Test error", "Test context")
+        assert 'ERROR:' in error_msg
+        assert 'Test error' in error_msg
+        
+        # Test system message formatting
+        system_msg = formatter.format_system_message("System ready", "success")
+        assert 'System ready' in system_msg
+
+    
+    @pytest.mark.parametrize("timestamp,expected", [
+        (None, None),
+        ('2023-01-01T12:00:00', '2023-01-01T12:00:00'),
+    ])
+    def test_to_iso_timestamp(self, timestamp, expected):
+        """Test a missing timestamp stays missing instead of becoming the current time"""
+        assert to_iso_timestamp(timestamp) == expected
+    
+    def test_to_iso_timestamp_epoch(self):
+        """Test epoch seconds from AIAnalyzer are formatted as ISO 8601"""
+        iso = to_iso_timestamp(1672574400.0)
+        assert datetime.fromisoformat(iso).timestamp() == 1672574400.0
+
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("interactions", [0, 2])
+    def test_json_export_layout(self, output_formatter, tmp_path, monkeypatch, interactions, use_orjson):
+        """Test the streamed JSON export is laid out exactly like json.dump(..., indent=2)"""
+        monkeypatch.setattr(output_formatter_module, 'ORJSON_AVAILABLE',
+                            use_orjson and output_formatter_module.ORJSON_AVAILABLE)
+        for i in range(interactions):
+            output_formatter.format_response(f"Héllo {i}", TEST_ANALYSIS)
+        path = tmp_path / "session.json"
+        
+        assert output_formatter.export_session(str(path), 'json')
+        
+        text = path.read_text(encoding='utf-8')
+        data = json.loads(text)
+        assert len(data['interactions']) == interactions
+        assert text == json.dumps(data, indent=2, ensure_ascii=False)
+
+
+if __name__ == '__main__':
+    # Run the tests (fixtures and parallel workers need pytest)
+    sys.exit(pytest.main([__file__]))
@@ -0,0 +1,70 @@
+"""
+Unit tests for the conversation history spill log
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from ai_analysis.history_log import HistoryLog
+
+
+class TestHistoryLog(unittest.TestCase):
+    """Tests for appending, reading back and clearing logged turns"""
+
+    def setUp(self):
+        self.log = HistoryLog()
+
+    def tearDown(self):
+        self.log.close()
+
+    def test_round_trip_in_order(self):
+        """Test that turns are read back unchanged and in order"""
+        turns = [{'user_text': f'turn {i}', 'ai_response': 'ok', 'timestamp': float(i)} for i in range(3)]
+        for turn in turns:
+            self.log.append(turn)
+
+        self.assertEqual(len(self.log), 3)
+        self.assertEqual(list(self.log), turns)
+
+    def test_clear(self):
+        """Test that clear removes every logged turn"""
+        self.log.append({'user_text': 'hello'})
+        self.log.clear()
+
+        self.assertEqual(len(self.log), 0)
+        self.assertEqual(list(self.log), [])
+
+    def test_reads_one_record_at_a_time(self):
+        """Test iteration reads each record from the file instead of the whole log at once"""
+        for i in range(3):
+            self.log.append({'user_text': 'x' * 1000 * (i + 1)})
+
+        reads = []
+        file = self.log._file
+
+        def read(size=-1):
+            reads.append(size)
+            return file.read(size)
+
+        with patch.object(self.log, '_file', SimpleNamespace(flush=file.flush, seek=file.seek, read=read)):
+            turns = list(self.log)
+
+        self.assertEqual([len(turn['user_text']) for turn in turns], [1000, 2000, 3000])
+        self.assertEqual(len(reads), 6)  # A length prefix and a record per turn
+        self.assertTrue(all(size > 0 for size in reads))
+
+    def test_appends_during_iteration_not_included(self):
+        """Test a turn appended mid-iteration is left for the next read"""
+        self.log.append({'user_text': 'first'})
+        turns = iter(self.log)
+        self.assertEqual(next(turns)['user_text'], 'first')
+
+        self.log.append({'user_text': 'second'})
+
+        self.assertEqual(list(turns), [])
+        self.assertEqual([turn['user_text'] for turn in self.log], ['first', 'second'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+"""
+Unit tests for the LLM response cache
+"""
+
+import unittest
+import numpy as np
+
+from ai_analysis.llm_cache import LLMCache
+
+
+class TestLLMCache(unittest.TestCase):
+    """Tests for exact and semantic cache lookups"""
+
+    def test_exact_hit_and_miss(self):
+        """Test exact key lookup"""
+        cache = LLMCache()
+        self.assertIsNone(cache.get('missing'))
+
+        cache.set('key', {'content': 'Hello', 'finish_reason': 'stop'})
+        self.assertEqual(cache.get('key')['content'], 'Hello')
+
+    def test_ttl_expiry(self):
+        """Test that expired entries are not returned"""
+        cache = LLMCache(ttl=-1)
+        cache.set('key', {'content': 'Hello', 'finish_reason': 'stop'})
+        self.assertIsNone(cache.get('key'))
+        self.assertEqual(len(cache), 0)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted"""
+        cache = LLMCache(max_entries=2)
+        cache.set('a', {'content': 'A'}, embedding=np.array([1.0, 0.0]), scope='s')
+        cache.set('b', {'content': 'B'})
+        cache.get('a')
+        cache.set('c', {'content': 'C'})
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+
+    def test_semantic_lookup(self):
+        """Test cosine-similarity lookup respects threshold and scope"""
+        cache = LLMCache()
+        cache.set('weather', {'content': 'Sunny'}, embedding=np.array([1.0, 0.1, 0.0]), scope='sentiment')
+        cache.set('food', {'content': 'Tasty'}, embedding=np.array([0.0, 1.0, 0.0]), scope='sentiment')
+
+        hit = cache.semantic_get(np.array([0.99, 0.12, 0.0]), threshold=0.92, scope='sentiment')
+        self.assertEqual(hit['content'], 'Sunny')
+
+        self.assertIsNone(cache.semantic_get(np.array([0.5, 0.5, 0.7]), threshold=0.92, scope='sentiment'))
+        self.assertIsNone(cache.semantic_get(np.array([1.0, 0.1, 0.0]), threshold=0.92, scope='intent'))
+
+    def test_semantic_lookup_skips_expired_matches(self):
+        """Test an expired best match falls through to the next-best live entry above the threshold"""
+        cache = LLMCache(ttl=-1)
+        cache.set('best', {'content': 'Old'}, embedding=np.array([1.0, 0.0]), scope='s')
+        cache.set('second', {'content': 'Old too'}, embedding=np.array([0.99, 0.05]), scope='s')
+        cache.ttl = 3600
+        cache.set('far', {'content': 'Unrelated'}, embedding=np.array([0.0, 1.0]), scope='s')
+        cache.set('third', {'content': 'Fresh'}, embedding=np.array([0.97, 0.1]), scope='s')
+
+        hit = cache.semantic_get(np.array([1.0, 0.0]), threshold=0.92, scope='s')
+
+        self.assertEqual(hit['content'], 'Fresh')
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.semantic_get(np.array([0.0, -1.0]), threshold=0.92, scope='s'))
+
+    def test_clear_resets_state(self):
+        """Test clear() drops the semantic index and statistics along with the entries"""
+        cache = LLMCache()
+        cache.set('key', {'content': 'Hello'}, embedding=np.array([1.0, 0.0]), scope='s')
+        cache.get('key')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertIsNone(cache._sem_matrix)
+        self.assertIsNone(cache._sem_scope_ids)
+        self.assertEqual(cache._scope_ids, {})
+        self.assertEqual((cache.hits, cache.misses), (0, 0))
+        self.assertIsNone(cache.semantic_get(np.array([1.0, 0.0]), scope='s'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
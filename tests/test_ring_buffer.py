@@ -0,0 +1,58 @@
+"""
+Unit tests for the SPSC ring buffer
+"""
+
+import threading
+import unittest
+
+import numpy as np
+
+from audio_handler.ring_buffer import SPSCRingBuffer, FrameRingBuffer
+
+
+class TestSPSCRingBuffer(unittest.TestCase):
+    """Tests for ordering, capacity and cross-thread handoff"""
+
+    def test_fifo_order_and_capacity(self):
+        """Test items come out in order and pushes fail when full"""
+        buffer = SPSCRingBuffer(capacity=2)
+        self.assertTrue(buffer.push('a'))
+        self.assertTrue(buffer.push('b'))
+        self.assertFalse(buffer.push('c'))
+
+        self.assertEqual(buffer.pop(timeout=0), 'a')
+        self.assertEqual(buffer.pop(timeout=0), 'b')
+        self.assertIsNone(buffer.pop(timeout=0))
+
+    def test_producer_consumer_threads(self):
+        """Test every item pushed by a producer thread reaches the consumer"""
+        buffer = SPSCRingBuffer(capacity=4)
+        count = 1000
+
+        def produce():
+            for i in range(count):
+                while not buffer.push(i):
+                    pass
+
+        producer = threading.Thread(target=produce)
+        producer.start()
+        received = [buffer.pop(timeout=5) for _ in range(count)]
+        producer.join()
+
+        self.assertEqual(received, list(range(count)))
+
+    def test_frame_buffer_copies_frames(self):
+        """Test frames are copied in from raw buffers and out as independent arrays"""
+        buffer = FrameRingBuffer(capacity=1, frame_size=4)
+        self.assertTrue(buffer.push(np.arange(4, dtype=np.int16).tobytes()))
+
+        frame = buffer.pop(timeout=0)
+        self.assertTrue(buffer.push(np.zeros(4, dtype=np.int16)))
+        np.testing.assert_array_equal(frame, [0, 1, 2, 3])
+
+        buffer.clear()
+        self.assertIsNone(buffer.pop(timeout=0))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
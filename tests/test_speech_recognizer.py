@@ -0,0 +1,194 @@
+"""
+Unit tests for speech recognizer audio preparation
+"""
+
+import contextlib
+import io
+import unittest
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import speech_recognition as sr
+from unittest.mock import Mock, patch
+
+from speech_to_text.speech_recognizer import SpeechRecognizer, VAD_WINDOW, audio_data_to_float32
+
+
+class TestAudioConversion(unittest.TestCase):
+    """Tests for converting AudioData to Whisper's float32 input"""
+
+    def test_scales_int16_to_unit_range(self):
+        """Test int16 samples map to float32 in [-1, 1)"""
+        samples = np.array([0, 16384, -32768], dtype='<i2')
+        audio = sr.AudioData(samples.tobytes(), 16000, 2)
+
+        result = audio_data_to_float32(audio)
+
+        self.assertEqual(result.dtype, np.float32)
+        np.testing.assert_allclose(result, [0.0, 0.5, -1.0])
+
+    def test_resamples_to_16khz(self):
+        """Test audio at another rate is resampled for Whisper"""
+        audio = sr.AudioData(np.zeros(8000, dtype='<i2').tobytes(), 8000, 2)
+
+        self.assertAlmostEqual(len(audio_data_to_float32(audio)), 16000, delta=2)
+
+
+class TestWhisperInputs(unittest.TestCase):
+    """Tests for the inputs handed to the Whisper model"""
+
+    def test_wav_bytes_decoded_in_memory(self):
+        """Test WAV bytes reach Whisper as a 16 kHz float32 array"""
+        recognizer = SpeechRecognizer(engine='google')
+        recognizer.whisper_backend = 'openai-whisper'
+        recognizer.whisper_model = SimpleNamespace(
+            transcribe=lambda audio, fp16: {'text': f" {audio.dtype} {len(audio)} "}
+        )
+
+        buffer = io.BytesIO()
+        with wave.open(buffer, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(16000)
+            wav.writeframes(np.zeros(1600, dtype='<i2').tobytes())
+
+        self.assertEqual(recognizer._transcribe_with_whisper(buffer.getvalue()), 'float32 1600')
+
+
+
+class FakeVAD:
+    """Silero VAD stand-in returning a fixed speech probability per window"""
+
+    def __init__(self, probs):
+        self.probs = probs
+        self.calls = []
+
+    def reset_states(self):
+        self.calls = []
+
+    def __call__(self, window, sample_rate):
+        self.calls.append((len(window), sample_rate))
+        return SimpleNamespace(item=lambda p=self.probs[len(self.calls) - 1]: p)
+
+
+@patch('speech_to_text.speech_recognizer.torch',
+       SimpleNamespace(no_grad=contextlib.nullcontext, from_numpy=lambda array: array))
+class TestSilenceTrimming(unittest.TestCase):
+    """Tests for dropping non-speech windows before Whisper"""
+
+    def make_recognizer(self, probs):
+        """Recognizer with a stub Whisper model and a VAD returning probs, one per window"""
+        recognizer = SpeechRecognizer(engine='google')
+        recognizer.vad_model = FakeVAD(probs)
+        recognizer.whisper_backend = 'openai-whisper'
+        recognizer.whisper_device = 'cpu'
+        recognizer.whisper_model = Mock()
+        recognizer.whisper_model.transcribe.return_value = {'text': ' speech '}
+        return recognizer
+
+    @staticmethod
+    def numbered_windows(n_windows, tail=0):
+        """Audio whose every sample holds the index of its 512-sample window"""
+        audio = np.repeat(np.arange(n_windows, dtype=np.float32), VAD_WINDOW)
+        return np.concatenate([audio, np.full(tail, -1, dtype=np.float32)])
+
+    def test_speech_windows_kept_with_padding(self):
+        """Test speech windows survive with six windows either side, and the gap between is dropped"""
+        probs = [0.0] * 20
+        probs[1] = probs[18] = 0.9
+        recognizer = self.make_recognizer(probs)
+
+        kept = recognizer._trim_silence(self.numbered_windows(20, tail=100))
+
+        self.assertEqual(recognizer.vad_model.calls, [(VAD_WINDOW, 16000)] * 20)
+        self.assertEqual(len(kept), 16 * VAD_WINDOW)
+        np.testing.assert_array_equal(np.unique(kept), [*range(0, 8), *range(12, 20)])
+
+    def test_threshold_is_inclusive(self):
+        """Test a window exactly at the speech threshold counts as speech"""
+        recognizer = self.make_recognizer([0.0] * 7 + [0.5] + [0.0] * 7)
+
+        kept = recognizer._trim_silence(self.numbered_windows(15))
+
+        np.testing.assert_array_equal(np.unique(kept), range(1, 14))
+
+    def test_silence_never_reaches_whisper(self):
+        """Test an all-silence clip is transcribed as '' without calling the model"""
+        recognizer = self.make_recognizer([0.1] * 10)
+
+        self.assertEqual(recognizer._run_whisper(self.numbered_windows(10)), '')
+        recognizer.whisper_model.transcribe.assert_not_called()
+
+    def test_clip_shorter_than_a_window_kept(self):
+        """Test a clip too short for one VAD window is passed to Whisper untouched"""
+        recognizer = self.make_recognizer([])
+        audio = np.ones(VAD_WINDOW - 1, dtype=np.float32)
+
+        self.assertEqual(recognizer._run_whisper(audio), 'speech')
+        self.assertEqual(recognizer.vad_model.calls, [])
+        self.assertIs(recognizer.whisper_model.transcribe.call_args.args[0], audio)
+
+
+class TestSpeechRecognizerInitialization:
+    """Tests for engine selection and Whisper model loading"""
+    
+    @pytest.mark.parametrize("engine", ['whisper', 'google'])
+    def test_speech_recognizer_initialization(self, engine):
+        """Test speech recognizer initialization with different engines"""
+        recognizer = SpeechRecognizer(engine=engine)
+        assert recognizer.engine == engine
+    
+    @patch.dict('speech_to_text.speech_recognizer._whisper_models', clear=True)
+    @patch('whisper.audio.mel_filters')
+    @patch('whisper.load_model')
+    def test_whisper_model_loading(self, mock_load_model, mock_mel_filters):
+        """Test Whisper model loading"""
+        # Mock Whisper model
+        mock_model = Mock()
+        mock_load_model.return_value = mock_model
+        
+        recognizer = SpeechRecognizer(engine='whisper', whisper_model='base', quantize=False,
+                                      whisper_backend='openai-whisper')
+        assert recognizer.whisper_model is not None
+        mock_load_model.assert_called_with('base', device=recognizer.whisper_device)
+    
+    @pytest.fixture
+    def unloaded_torch(self, monkeypatch):
+        """Stand in for the lazy torch module and return the attribute names accessed on it"""
+        touched = []
+        
+        class UnloadedTorch:
+            """Stands in for the lazy torch module and records any attribute access"""
+            def __getattr__(self, name):
+                touched.append(name)
+                raise AssertionError(f"torch.{name} accessed")
+        
+        monkeypatch.setattr('speech_to_text.speech_recognizer.torch', UnloadedTorch())
+        monkeypatch.setattr('speech_to_text.speech_recognizer.TORCH_AVAILABLE', True)
+        return touched
+    
+    def test_google_engine_never_executes_torch(self, unloaded_torch):
+        """Test building a non-Whisper recognizer leaves the lazy torch module untouched"""
+        recognizer = SpeechRecognizer(engine='google')
+        assert recognizer.engine == 'google'
+        # Any attribute access is what makes a LazyLoader module execute
+        assert unloaded_torch == []
+    
+    def test_faster_whisper_never_executes_torch(self, unloaded_torch, monkeypatch):
+        """Test loading a faster-whisper model leaves the lazy torch module untouched"""
+        module = 'speech_to_text.speech_recognizer'
+        monkeypatch.setattr(f'{module}.FASTER_WHISPER_AVAILABLE', True)
+        monkeypatch.setattr(f'{module}.WhisperModel', Mock(name='WhisperModel'))
+        monkeypatch.setattr(f'{module}.ctranslate2', SimpleNamespace(get_cuda_device_count=lambda: 0))
+        monkeypatch.setattr(f'{module}.SILERO_VAD_PATH', None)
+        monkeypatch.setattr(f'{module}._whisper_models', {})
+        
+        recognizer = SpeechRecognizer(engine='whisper', whisper_backend='faster-whisper', compile_encoder=False)
+        
+        assert recognizer.whisper_model is not None
+        assert unloaded_torch == []
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
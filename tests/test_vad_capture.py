@@ -0,0 +1,51 @@
+"""
+Unit tests for VAD capture frame gating
+"""
+
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+from audio_handler.vad_capture import VADCapture, find_input_device, frame_rms
+
+
+class TestEnergyGating(unittest.TestCase):
+    """Tests for the numpy RMS gate used when webrtcvad is unavailable"""
+
+    def test_frame_rms(self):
+        """Test RMS of a constant frame, including full-scale samples"""
+        self.assertAlmostEqual(frame_rms(np.full(480, -32768, dtype=np.int16)), 32768.0)
+        self.assertAlmostEqual(frame_rms(np.zeros(480, dtype=np.int16)), 0.0)
+
+    def test_energy_gate(self):
+        """Test frames above the energy threshold count as speech"""
+        capture = VADCapture(sample_rate=16000, energy_threshold=300)
+        capture.vad = None  # Force energy gating even if webrtcvad is installed
+
+        self.assertTrue(capture.is_speech(np.full(capture.frame_size, 1000, dtype=np.int16)))
+        self.assertFalse(capture.is_speech(np.full(capture.frame_size, 100, dtype=np.int16)))
+
+
+
+class TestFindInputDevice(unittest.TestCase):
+    """Tests for mapping a PyAudio device name to a sounddevice index"""
+
+    DEVICES = [
+        {'name': 'HDMI Output', 'max_input_channels': 0},
+        {'name': 'USB Mic (hw:1,0)', 'max_input_channels': 1},
+        {'name': 'Built-in Microphone', 'max_input_channels': 2},
+    ]
+
+    def test_matches_input_devices_by_name(self):
+        """Test exact and suffix-tolerant name matches, skipping output-only devices"""
+        fake_sd = SimpleNamespace(query_devices=lambda: self.DEVICES)
+        with patch('audio_handler.vad_capture.sd', fake_sd):
+            self.assertEqual(find_input_device('Built-in Microphone'), 2)
+            self.assertEqual(find_input_device('USB Mic'), 1)
+            self.assertIsNone(find_input_device('HDMI Output'))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
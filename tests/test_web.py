@@ -0,0 +1,143 @@
+"""
+Integration tests for the web interface
+"""
+
+import io
+import json
+import sys
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+import web_interface.app as web_app
+from output_processor.output_formatter import to_iso_timestamp
+
+
+@pytest.fixture
+def components(monkeypatch, audio_handler):
+    """
+    Swap the app's component globals for fakes whose calls the test can inspect
+
+    Uploads are decoded by a real audio handler. The recognizer records the submitted
+    audio and hands back components.transcription, which the test resolves (or leaves
+    pending).
+    """
+    components = SimpleNamespace(submitted=[], transcription=Future())
+
+    def submit_transcription(audio_data):
+        components.submitted.append(audio_data)
+        return components.transcription
+
+    monkeypatch.setattr(web_app, 'speech_recognizer', SimpleNamespace(submit_transcription=submit_transcription))
+    monkeypatch.setattr(web_app, 'audio_handler', audio_handler)
+    monkeypatch.setattr(web_app, 'output_formatter',
+                        SimpleNamespace(format_response=lambda text, result: f"You: {text}"))
+    return components
+
+
+@pytest.fixture
+def wav_upload(test_audio_file):
+    """Multipart form data uploading the session test tone as a WAV file"""
+    with open(test_audio_file, 'rb') as f:
+        data = f.read()
+    return lambda: {'audio': (io.BytesIO(data), 'clip.wav')}
+
+
+class TestWebIntegration:
+    """Test web interface integration"""
+    
+    def test_app_creation(self, flask_client):
+        """Test Flask app creation"""
+        assert flask_client.application is not None
+        
+        # Test health endpoint
+        response = flask_client.get('/api/health')
+        assert response.status_code == 200
+
+
+class TestProcessAudio:
+    """Tests for the /api/process-audio upload endpoint"""
+    
+    def test_transcription_timeout(self, flask_client, components, wav_upload, monkeypatch):
+        """Test a transcription that doesn't finish in time gives a 504 and is dropped"""
+        monkeypatch.setattr(web_app, 'TRANSCRIPTION_TIMEOUT', 0.01)
+        
+        response = flask_client.post('/api/process-audio', data=wav_upload())
+        
+        assert response.status_code == 504
+        assert 'timed out' in response.get_json()['error']
+        assert components.transcription.cancelled()
+
+    
+    def test_wav_upload_decoded_in_memory(self, flask_client, components, wav_upload, monkeypatch, tmp_path):
+        """Test a WAV upload is transcribed without writing it to the temp directory"""
+        monkeypatch.setattr('tempfile.tempdir', str(tmp_path))
+        monkeypatch.setattr(web_app.audio_handler, 'load_audio_file',
+                            lambda path: pytest.fail(f"upload was written to {path}"))
+        monkeypatch.setattr(web_app, 'ai_analyzer', SimpleNamespace(
+            analyze_text=lambda text: {'response': 'Hi there', 'analysis': {}, 'timestamp': None}
+        ))
+        components.transcription.set_result("hello")
+        
+        response = flask_client.post('/api/process-audio', data=wav_upload())
+        
+        assert response.status_code == 200
+        assert response.get_json()['transcribed_text'] == "hello"
+        [audio_data] = components.submitted
+        assert (audio_data.sample_rate, audio_data.sample_width) == (16000, 2)
+        assert len(audio_data.frame_data) == 32000
+        assert list(tmp_path.iterdir()) == []
+
+
+
+class TestProcessAudioStream:
+    """Tests for NDJSON streaming of /api/process-audio results"""
+    
+    NDJSON = {'Accept': 'application/x-ndjson'}
+    
+    @staticmethod
+    def post_lines(client, data):
+        """Upload audio asking for NDJSON and return the content type and decoded lines"""
+        response = client.post('/api/process-audio', data=data, headers=TestProcessAudioStream.NDJSON)
+        assert response.status_code == 200
+        return response.mimetype, [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    
+    def test_stream_stages(self, flask_client, components, wav_upload, monkeypatch):
+        """Test the transcript comes first, then each token, then the final result"""
+        def analyze_text_stream(text):
+            yield "Hi "
+            yield "there"
+            return {'response': 'Hi there', 'analysis': {'word_count': 2}, 'timestamp': 1672574400.0}
+        
+        monkeypatch.setattr(web_app, 'ai_analyzer', SimpleNamespace(analyze_text_stream=analyze_text_stream))
+        components.transcription.set_result("hello")
+        
+        mimetype, lines = self.post_lines(flask_client, wav_upload())
+        
+        assert mimetype == 'application/x-ndjson'
+        assert [line['stage'] for line in lines] == ['transcribed', 'token', 'token', 'ai']
+        assert lines[0]['transcribed_text'] == "hello"
+        assert [line['text'] for line in lines[1:3]] == ["Hi ", "there"]
+        assert lines[3]['ai_response'] == 'Hi there'
+        assert lines[3]['formatted_output'] == "You: hello"
+        assert lines[3]['timestamp'] == to_iso_timestamp(1672574400.0)
+    
+    def test_stream_error_line(self, flask_client, components, wav_upload, monkeypatch):
+        """Test an analyzer failure after the transcript ends the stream with an error line"""
+        def analyze_text_stream(text):
+            yield "Hi "
+            raise RuntimeError("AI service down")
+        
+        monkeypatch.setattr(web_app, 'ai_analyzer', SimpleNamespace(analyze_text_stream=analyze_text_stream))
+        components.transcription.set_result("hello")
+        
+        _, lines = self.post_lines(flask_client, wav_upload())
+        
+        assert [line['stage'] for line in lines] == ['transcribed', 'token', 'error']
+        assert 'AI service down' in lines[-1]['error']
+
+
+if __name__ == '__main__':
+    # Run the tests (fixtures and parallel workers need pytest)
+    sys.exit(pytest.main([__file__]))